@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+import os
+import copy
+
+# setting environment variable for ADAPT_CONFIGS as empty string
+# so that it will not read any configs from the default path
+os.environ["ADAPT_CONFIGS"] = ""
+
+from adapt.serializer.serializer import Serializer
+from adapt.utils.config_reader import YamlReader
+
+import dict_normalization
+import json_pipeline
+
+
+EXAMPLES = [
+    ("configs/json_pipeline.yaml", json_pipeline.data),
+    ("configs/dict_normalization.yaml", dict_normalization.data),
+]
+
+
+def exported(config, data, project):
+    """ the export fields of the serialized records """
+    fields = config["export"]["fields"]
+    serializer = Serializer.init(copy.deepcopy(config), project=project)
+    return [dict((field, record.get(field)) for field in fields)
+            for record in serializer.serialize_records(copy.deepcopy(data))]
+
+
+def main():
+    """
+    serializes the example configs with `project=True`, which skips the
+    fields the export does not need (they are printed), and checks that
+    the exported fields are the same as without the projection
+    """
+    for config_path, data in EXAMPLES:
+        config = YamlReader.read(os.path.join(os.path.dirname(__file__), config_path))
+        expected = exported(config, data, project=None)
+        records = exported(config, data, project=True)
+        assert records == expected, "projected export differs for {!r}".format(config_path)
+        print("[OK] {}: {} records, same export fields".format(config_path, len(records)))
+
+
+if __name__ == "__main__":
+    main()
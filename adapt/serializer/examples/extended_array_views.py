@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+import os
+import sys
+import copy
+import time
+import tracemalloc
+
+# setting environment variable for ADAPT_CONFIGS as empty string
+# so that it will not read any configs from the default path
+os.environ["ADAPT_CONFIGS"] = ""
+
+from adapt.serializer.serializer import Serializer
+from adapt.utils.config_reader import YamlReader
+
+
+def make_data(campaigns, ad_sets, ads):
+    """ synthetic campaign -> ad set -> ad hierarchy """
+    return [
+        {
+            "id": 1000 + c,
+            "name": "Campaign %02d" % c,
+            "status": "RUNNING",
+            "start_date": "23/01/23",
+            "end_date": "23/01/24",
+            "daily_budget": 100 + c,
+            "ad_sets": [
+                {
+                    "id": 100000 + c * ad_sets + s,
+                    "name": "Campaign %02d :: adSet %02d" % (c, s),
+                    "status": "PAUSED",
+                    "start_date": "23/01/23",
+                    "end_date": "23/01/24",
+                    "daily_budget": "34",
+                    "promoted_object": {
+                        "optimization_goal": "LINK_CLICKS",
+                        "custom_event_type": "ADD_TO_CART"
+                    },
+                    "ads": [
+                        {
+                            "id": 10000000 + (c * ad_sets + s) * ads + a,
+                            "name": "Campaign %02d :: adSet %02d :: ad %03d" % (c, s, a),
+                            "status": "RUNNING",
+                        }
+                        for a in range(ads)
+                    ]
+                }
+                for s in range(ad_sets)
+            ]
+        }
+        for c in range(campaigns)
+    ]
+
+
+def load_config(view):
+    config = YamlReader.read(os.path.join(os.path.dirname(__file__), "configs/dict_normalization.yaml"))
+    fields = config["inline"]
+    while fields:
+        extended = [field for field in fields if field.get("type") == "extended_array"]
+        for field in extended:
+            field["view"] = view
+        fields = [nested for field in extended for nested in field.get("inline", [])]
+    return config
+
+
+# parent and child records both holding an "x" field
+OVERLAPPING_CONFIG = {
+    "inline": [
+        {"name": "pid", "from": "id", "transform": {"type": "integer"}},
+        {"name": "x", "from": "x", "transform": {"type": "string"}},
+        {
+            "name": "kids",
+            "from": "kids",
+            "type": "extended_array",
+            "inline": [
+                {"name": "kid", "from": "id", "transform": {"type": "integer"}},
+                {"name": "x", "from": "x", "transform": {"type": "string"}},
+            ]
+        },
+    ]
+}
+
+OVERLAPPING_DATA = [{"id": 1, "x": "parent", "kids": [{"id": 10, "x": "child"}, {"id": 11, "x": "child"}]}]
+
+
+def serialize(config, data, dict_normalize):
+    serializer = Serializer.init(config, dict_normalize=dict_normalize)
+    return [dict(record) for record in serializer.serialize_records(copy.deepcopy(data))]
+
+
+def check_same_rows(data, dict_normalize):
+    """ the view mode only saves memory, both modes output the same rows """
+    rows = serialize(load_config(False), data, dict_normalize)
+    assert rows == serialize(load_config(True), data, dict_normalize), "view rows differ from copy rows"
+    overlapping = {}
+    for view in (False, True):
+        config = copy.deepcopy(OVERLAPPING_CONFIG)
+        config["inline"][2]["view"] = view
+        overlapping[view] = serialize(config, OVERLAPPING_DATA, dict_normalize)
+    # the parent field wins over the child field of the same name
+    assert overlapping[False] == overlapping[True], "view rows differ from copy rows"
+    assert all(row["x"] == "parent" for row in overlapping[True])
+
+
+def measure(data, view, dict_normalize):
+    serializer = Serializer.init(load_config(view), dict_normalize=dict_normalize)
+    # timed apart, tracing slows down every allocation
+    rows = copy.deepcopy(data)
+    start = time.perf_counter()
+    for _ in serializer.serialize_records(rows):
+        pass
+    elapsed = time.perf_counter() - start
+    data = copy.deepcopy(data)
+    tracemalloc.start()
+    # records are kept, as they would be by a buffering exporter
+    records = list(serializer.serialize_records(data))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(records), peak, elapsed
+
+
+def main():
+    """
+    compares the memory held by the records of an extended_array fanned
+    out by copying the parent fields into every child (default) and by
+    layering the children on the shared parent (`view: true`), after
+    checking that both modes output the same rows
+    """
+    ads = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    data = make_data(campaigns=20, ad_sets=10, ads=ads)
+    for dict_normalize in (False, True):
+        check_same_rows(make_data(campaigns=2, ad_sets=2, ads=3), dict_normalize)
+        results = {}
+        for view in (False, True):
+            count, peak, elapsed = measure(data, view, dict_normalize)
+            results[view] = peak
+            print("dict_normalize={!s:5} view={!s:5} records={} peak={:8.1f} MiB time={:.2f}s".format(
+                dict_normalize, view, count, peak / 2 ** 20, elapsed))
+        print("memory reduction: {:.1f}x".format(results[False] / float(results[True])))
+
+
+if __name__ == "__main__":
+    main()
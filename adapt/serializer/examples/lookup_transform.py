@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+import os
+import csv
+import shutil
+import sqlite3
+import tempfile
+
+# setting environment variable for ADAPT_CONFIGS as empty string
+# so that it will not read any configs from the default path
+os.environ["ADAPT_CONFIGS"] = ""
+
+from adapt.serializer.serializer import Serializer
+
+
+BACKENDS = ["interpreter", "plan", "codegen"]
+
+data = [
+    {"account_id": "1001", "currency": "EUR", "report_date": "2025-01-02", "cost": "10.5"},
+    {"account_id": "1002", "currency": "USD", "report_date": "2025-01-02", "cost": "4"},
+    {"account_id": "1003", "currency": "GBP", "report_date": "2025-01-03", "cost": "7.25"},
+]
+
+
+def write_tables(directory):
+    """ the reference tables of the README: a csv region map and a sqlite fx table """
+    regions = os.path.join(directory, "account_regions.csv")
+    with open(regions, "w", newline="") as _file:
+        writer = csv.writer(_file)
+        writer.writerow(["account_id", "region"])
+        writer.writerows([["1001", "EMEA"], ["1002", "AMER"]])
+    fx_rates = os.path.join(directory, "fx_rates.sqlite")
+    with sqlite3.connect(fx_rates) as connection:
+        connection.execute("CREATE TABLE fx_rates (currency TEXT, date TEXT, rate TEXT)")
+        connection.execute("CREATE INDEX fx_rates_key ON fx_rates (currency, date)")
+        connection.executemany("INSERT INTO fx_rates VALUES (?, ?, ?)", [
+            ("EUR", "2025-01-02", "1.0321"), ("USD", "2025-01-02", "1"), ("GBP", "2025-01-03", "1.2412")])
+    return regions, fx_rates
+
+
+def make_config(regions, fx_rates):
+    return {
+        "inline": [
+            {"name": "account_id", "from": "account_id", "transform": {"type": "string"}},
+            {"name": "currency", "from": "currency", "transform": {"type": "string"}},
+            {"name": "report_date", "from": "report_date", "transform": {"type": "string"}},
+            # a float without rounding
+            {"name": "cost", "from": "cost", "transform": {"type": "float", "precision": None}},
+            {"name": "region", "from": "account_id",
+             "transform": {"type": "lookup", "source": regions, "key": "account_id", "value": "region",
+                           "default": "UNKNOWN"}},
+        ],
+        "derived": [
+            # the documented bare type cast, and a cast with parameters
+            {"name": "fx_rate",
+             "transform": {"type": "lookup", "source": fx_rates, "table": "fx_rates",
+                           "key": ["currency", "date"], "fields": ["currency", "report_date"],
+                           "value": "rate", "cast": "float"}},
+            {"name": "fx_rate_2",
+             "transform": {"type": "lookup", "source": fx_rates, "table": "fx_rates",
+                           "key": ["currency", "date"], "fields": ["currency", "report_date"],
+                           "value": "rate", "cast": {"type": "float", "precision": 2}}},
+        ]
+    }
+
+
+def main():
+    """
+    enriches records from a csv and a sqlite reference table, and checks
+    the values looked up, cast with `cast: float` and with a precision,
+    with every backend
+    """
+    directory = tempfile.mkdtemp(prefix="adapt-lookup-example.")
+    try:
+        config = make_config(*write_tables(directory))
+        for backend in BACKENDS:
+            records = list(Serializer.lazy_run(config, data, backend=backend))
+            for record in records:
+                print(backend, record)
+            assert [record["region"] for record in records] == ["EMEA", "AMER", "UNKNOWN"]
+            assert [record["cost"] for record in records] == [10.5, 4.0, 7.25]
+            assert [record["fx_rate"] for record in records] == [1.0321, 1.0, 1.2412]
+            assert [record["fx_rate_2"] for record in records] == [1.03, 1.0, 1.24]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+from typing import Any, Callable, Dict, List, Optional
+
+from adapt.serializer import serializer as _serializer
+from adapt.serializer import serializer_typing
+
+
+__all__ = [
+    "SerializerBatch"
+]
+
+
+def _mask(when, values):
+    # type: (Dict, List) -> List[bool]
+    """
+    evaluates a case / ignore predicate on a column, vectorized for
+    `greater_than` / `less_than` on numeric columns
+    """
+    op = serializer_typing.predicate_op(when)
+    operand = when[op]
+    if op in ("greater_than", "less_than") and isinstance(operand, (int, float)) \
+            and not isinstance(operand, bool):
+        array = serializer_typing._numeric_array(values)
+        if array is not None:
+            compared = array > operand if op == "greater_than" else array < operand
+            # scalar predicate is `value and value > operand`, zero is falsy
+            return ((array != 0) & compared).tolist()
+    predicate = serializer_typing.compile_predicate(when)
+    return [bool(predicate(value)) for value in values]
+
+
+def _apply(transform, values):
+    # type: (Callable, List) -> List
+    call_batch = getattr(transform, "call_batch", None)
+    if call_batch is not None:
+        return call_batch(values)
+    return list(map(transform, values))
+
+
+class SerializerBatch(object):
+    """
+    Serializes chunks of records column-wise.
+
+    Inline fields are gathered into columns once per batch and transformed
+    with the `call_batch` method of the transform when it has one
+    (vectorized with NumPy for currency and ratio, when installed). Derived
+    `case` fields evaluate their predicates as masks over the columns.
+    Anything without a batch form runs through the row-wise plan. The
+    transforms are the ones of the row-wise mode, so are their errors,
+    raised for the first failing column instead of the first failing row.
+    """
+
+    def __init__(self, serializer, dict_normalize=False):
+        # type: (_serializer._SerializerTyping, Optional[bool]) -> None
+        self._serializer = serializer
+        self._plan = _serializer._SerializerPlan(serializer, dict_normalize=dict_normalize)
+        self._template = None
+        if dict_normalize:
+            self._template = dict.fromkeys(serializer.get_master_keys())
+        self._columnar = True
+        self._inline = []
+        self._derived = []
+        self._constants = {}
+        self.compile()
+
+    def compile(self):
+        config = self._serializer.config
+        for field in config.get(_serializer._INLINE_TOKEN, []):
+            if field.get("type") == "extended_array":
+                # fanned out records do not fit columns
+                self._columnar = False
+                return
+            if field.get("type") == "array":
+                self._inline.append((field["name"], 0, self._mk_array_column(field)))
+                continue
+            # objects shared with the plan, resolved once per batch
+            self._inline.append((field["name"], self._plan._objects.get(field.get("object"), 0),
+                                 self._mk_inline_column(field)))
+        for field in config.get(_serializer._DERIVED_TOKEN, []):
+            self._derived.append((field["name"], self._mk_derived_column(field)))
+        self._constants = self._plan._constants
+
+    def _mk_array_column(self, field):
+        step = self._plan._mk_array_step(field)
+        name = field["name"]
+
+        def column(rows):
+            store = {}
+            values = []
+            for row in rows:
+                step(row, store)
+                values.append(store[name])
+            return values
+        return column
+
+    def _mk_ignore_value(self, field):
+        # type: (dict) -> Optional[Callable]
+        """ returns the ignore value of a row, or the poison pill """
+        if "ignore" not in field:
+            return None
+        check = self._serializer.get_serializer(_serializer._IGNORE_TOKEN, field["name"])
+
+        def ignore_value(row):
+            try:
+                return check(row)
+            except KeyError:
+                return None
+        return ignore_value
+
+    def _mk_inline_column(self, field):
+        transform = self._serializer.get_serializer(_serializer._INLINE_TOKEN, field["name"])
+        ignore_value = self._mk_ignore_value(field)
+        source = None if field["transform"]["type"] == "case" else field["from"]
+        get = None if source is None else serializer_typing.path_getter(source)
+        not_found = _serializer._NESTED_OBJECT_NOT_FOUND
+        pill = _serializer._IGNORE_POISON_PILL
+
+        def column(inner):
+            # rows, or their resolved "object" of the field
+            output = [None] * len(inner)
+            pending = []
+            for i, row in enumerate(inner):
+                if row is not_found:
+                    continue
+                if ignore_value is not None:
+                    value = ignore_value(row)
+                    if value != pill:
+                        output[i] = value
+                        continue
+                pending.append(i)
+            if source is None:
+                values = [inner[i] for i in pending]
+            else:
+                values = [get(inner[i]) for i in pending]
+            for i, value in zip(pending, _apply(transform, values)):
+                output[i] = value
+            return output
+        return column
+
+    def _mk_derived_column(self, field):
+        # type: (dict) -> Callable
+        """
+        returns a callable computing the derived column from the columns
+        and the row stores, falls back to the row-wise plan step
+        """
+        name = field["name"]
+        transform = self._serializer.get_serializer(_serializer._DERIVED_TOKEN, name)
+        params = field["transform"]
+        if "ignore" in field:
+            return self._mk_rowwise_column(field)
+        if params["type"] == "case":
+            column = self._mk_case_column(params)
+            if isinstance(transform, serializer_typing.InternedTransform):
+                intern = transform.intern
+                return lambda columns, stores: list(map(intern, column(columns, stores)))
+            return column
+        if "from" in field:
+            source = field["from"]
+            return lambda columns, stores: _apply(transform, self._column(columns, source, len(stores)))
+        if getattr(transform, "has_record_access", False):
+            return lambda columns, stores: _apply(transform, stores)
+        return self._mk_rowwise_column(field)
+
+    def _mk_rowwise_column(self, field):
+        step = self._plan._mk_derived_step(field)
+        name = field["name"]
+
+        def column(columns, stores):
+            for store in stores:
+                step(store)
+            return [store[name] for store in stores]
+        return column
+
+    def _mk_then(self, then, when_field):
+        # type: (Any, str) -> Callable
+        """ returns a callable computing `then` for the selected rows """
+        if not isinstance(then, dict):
+            return lambda columns, stores, selected: [then] * len(selected)
+        params = dict(then)
+        source = params.pop("field", when_field)
+        transform = serializer_typing.init_type(params["type"], params)
+        if "field" not in then and getattr(transform, "has_record_access", False):
+            return lambda columns, stores, selected: _apply(transform, [stores[i] for i in selected])
+        if "." in source:
+            # a nested value of the records, not a column
+            get = serializer_typing.path_getter(source)
+            return lambda columns, stores, selected: _apply(transform, [get(stores[i]) for i in selected])
+
+        def compute(columns, stores, selected):
+            values = self._column(columns, source, len(stores))
+            return _apply(transform, [values[i] for i in selected])
+        return compute
+
+    def _mk_case_column(self, params):
+        cases = [(case["when"], self._mk_then(case["then"], case["when"]["field"]))
+                 for case in params["cases"]]
+        default = params.get("default")
+
+        def column(columns, stores):
+            output = [default] * len(stores)
+            remaining = list(range(len(stores)))
+            for when, then in cases:
+                if not remaining:
+                    break
+                try:
+                    values = self._column(columns, when["field"], len(stores))
+                except KeyError:
+                    # field not in the record, the case does not apply
+                    continue
+                mask = _mask(when, [values[i] for i in remaining])
+                selected = [i for i, hit in zip(remaining, mask) if hit]
+                remaining = [i for i, hit in zip(remaining, mask) if not hit]
+                for i, value in zip(selected, then(columns, stores, selected)):
+                    output[i] = value
+            return output
+        return column
+
+    def _column(self, columns, name, size):
+        # type: (Dict[str, List], str, int) -> List
+        """
+        returns the column of the field, normalized records hold None for
+        the fields which are not computed yet
+        """
+        if name in columns:
+            return columns[name]
+        if self._template is not None and name in self._template:
+            return [None] * size
+        raise KeyError(name)
+
+    def _serialize_columns(self, rows):
+        # type: (List[dict]) -> List[dict]
+        columns = {}
+        objects = self._plan._resolve_objects(rows)
+        for name, index, column in self._inline:
+            columns[name] = column(objects[index])
+        names = list(columns)
+        if self._template is None:
+            stores = [dict(zip(names, values)) for values in zip(*columns.values())]
+        else:
+            stores = []
+            for values in zip(*columns.values()):
+                store = self._template.copy()
+                store.update(zip(names, values))
+                stores.append(store)
+        if not names:
+            stores = [{} if self._template is None else self._template.copy() for _ in rows]
+        for name, column in self._derived:
+            values = column(columns, stores)
+            columns[name] = values
+            for store, value in zip(stores, values):
+                store[name] = value
+        if self._constants:
+            for store in stores:
+                store.update(self._constants)
+        return stores
+
+    def serialize_batch(self, rows):
+        # type: (List[dict]) -> List[dict]
+        rows = list(rows)
+        if self._columnar:
+            return self._serialize_columns(rows)
+        # fanned out records, row by row
+        records = []
+        for record in self._plan.serialize_records(rows):
+            records.append(record)
+        return records
+
+    @staticmethod
+    def to_columns(records):
+        # type: (List[dict]) -> Dict[str, List]
+        columns = {}
+        for i, record in enumerate(records):
+            for key, value in record.items():
+                if key not in columns:
+                    columns[key] = [None] * i
+                columns[key].append(value)
+            for key, values in columns.items():
+                if len(values) == i:
+                    values.append(None)
+        return columns
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+from typing import Dict, Optional
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import tempfile
+
+from adapt.serializer import codegen
+
+
+__all__ = [
+    "SerializerCache"
+]
+
+ADAPT_SERIALIZER_CACHE_DIR = os.getenv("ADAPT_SERIALIZER_CACHE_DIR")
+
+# modules whose changes invalidate the generated code
+_SOURCE_MODULES = ("serializer.py", "serializer_typing.py", "codegen.py")
+
+_FINGERPRINT = None
+
+
+def _package_version():
+    # type: () -> str
+    try:
+        from importlib import metadata
+        return metadata.version("adapt-serializer")
+    except Exception:
+        return "unknown"
+
+
+def _fingerprint():
+    # type: () -> str
+    """
+    identifies the package build: package version, python bytecode magic
+    and the sources of the modules generating the code
+    """
+    global _FINGERPRINT
+    if _FINGERPRINT is None:
+        digest = hashlib.sha256()
+        digest.update(_package_version().encode("utf-8"))
+        digest.update(importlib.util.MAGIC_NUMBER)
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        for module in _SOURCE_MODULES:
+            with open(os.path.join(base_dir, module), "rb") as _file:
+                digest.update(_file.read())
+        _FINGERPRINT = digest.hexdigest()
+    return _FINGERPRINT
+
+
+class SerializerCache(object):
+    """
+    Persistent on-disk cache of code generated serializers.
+
+    Entries are keyed by a content hash of the config, the dict_normalize
+    flag and the package fingerprint. The generated code object is stored
+    with marshal and the bound constants with pickle, so a cache hit skips
+    building `_SerializerTyping` and generating the source.
+    """
+
+    def __init__(self, cache_dir):
+        # type: (str) -> None
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def key(config, dict_normalize=False):
+        # type: (Dict, bool) -> str
+        payload = json.dumps([config, bool(dict_normalize)], sort_keys=True, default=repr)
+        digest = hashlib.sha256(payload.encode("utf-8"))
+        digest.update(_fingerprint().encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        # type: (str) -> str
+        return os.path.join(self.cache_dir, "{}.pickle".format(key))
+
+    def get(self, key):
+        # type: (str) -> Optional[codegen.SerializerCodegen]
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as _file:
+                return codegen.SerializerCodegen.load(pickle.load(_file))
+        except Exception as exc:
+            # a broken cache entry must never fail the run
+            print("[SERIALIZER] ignoring unreadable cache entry {!r}: {}".format(path, exc))
+            return None
+
+    def put(self, key, compiled):
+        # type: (str, codegen.SerializerCodegen) -> None
+        try:
+            payload = pickle.dumps(compiled.dump(), protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as exc:
+            print("[SERIALIZER] serializer is not cacheable: {}".format(exc))
+            return
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir, exist_ok=True)
+        _fd, tmp_file = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(_fd, "wb") as _file:
+            _file.write(payload)
+        # atomic publish, concurrent runs may race on the same entry
+        os.replace(tmp_file, self._path(key))
+
+    def load_or_compile(self, config, dict_normalize=False):
+        # type: (Dict, bool) -> codegen.SerializerCodegen
+        from adapt.serializer.serializer import _SerializerTyping
+        key = self.key(config, dict_normalize)
+        compiled = self.get(key)
+        if compiled is None:
+            compiled = codegen.SerializerCodegen(_SerializerTyping(config), dict_normalize=dict_normalize)
+            self.put(key, compiled)
+        return compiled
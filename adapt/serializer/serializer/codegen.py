@@ -0,0 +1,412 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+from typing import Any, Dict, Optional
+import hashlib
+import itertools
+import linecache
+import marshal
+import math
+
+from adapt.serializer import serializer as _serializer
+from adapt.serializer import serializer_typing
+
+
+__all__ = [
+    "SerializerCodegen"
+]
+
+
+_ENUM_ON_ERROR_TOKEN = "##ON_ERROR_TOKEN##"
+
+_PREDICATES = {
+    "greater_than": "({v} and {v} > {when})",
+    "less_than": "({v} and {v} < {when})",
+    "equal": "{v} == {when}",
+    "not_equal": "{v} != {when}",
+    "in": "{v} in {when}",
+    "not_in": "{v} not in {when}",
+    "null": "{v} is None",
+    "not_null": "{v} is not None",
+}
+
+# predicates which do not raise, safe to evaluate ahead of their branch
+_EAGER_PREDICATES = ("equal", "not_equal", "in", "not_in", "null", "not_null")
+
+# membership on a frozenset, unhashable values are never in hashable members
+_SET_PREDICATES = {
+    "in": "({v}.__hash__ is not None and {v} in {when})",
+    "not_in": "({v}.__hash__ is None or {v} not in {when})",
+}
+
+
+def _enum_or_raise(mappings, value):
+    if value in mappings:
+        return mappings[value]
+    raise Exception("Value {!r} not found in mappings {!r}".format(value, mappings))
+
+
+class SerializerCodegen(_serializer._SerializerPlan):
+    """
+    Generates a straight-line python function for one serializer config.
+
+    Every inline field becomes a local variable, the common transforms
+    (integer, string, bool, float, currency, enum) are inlined, enum mappings
+    are bound as module level constants and case / ignore conditions become
+    plain `if` chains. Transforms without an inline form are called through
+    their `serializer_typing` instance. Each "object" path is resolved into
+    a local variable once per row, dotted `from` paths use item getters
+    built when the code is loaded. The generated code is available as
+    `source` for debugging.
+    """
+
+    def __init__(self, serializer, dict_normalize=False):
+        # type: (_serializer._SerializerTyping, Optional[bool]) -> None
+        self._counter = itertools.count()
+        self._bound = {}
+        self._children = {}
+        self._lines = []
+        # conditions on the row shared across fields, by variable name
+        self._shared = {}
+        # module level lines of the generated code, run before `serialize`
+        self._prelude = []
+        self._getters = {}
+        # variables of the resolved "object" paths, by path
+        self._object_vars = {}
+        self._code = None
+        self.source = None
+        super(SerializerCodegen, self).__init__(serializer, dict_normalize=dict_normalize)
+
+    # ------------------------------------------------------------------
+    #                       source helpers
+    # ------------------------------------------------------------------
+
+    def _emit(self, line, depth=1):
+        self._lines.append("    " * depth + line)
+
+    def _bind(self, value, prefix="_k"):
+        # type: (Any, str) -> str
+        """ binds the value as a module level constant of generated code """
+        name = "%s%d" % (prefix, next(self._counter))
+        self._bound[name] = value
+        return name
+
+    def _literal(self, value):
+        # type: (Any) -> str
+        if value is None or isinstance(value, (bool, int, str)):
+            return repr(value)
+        if isinstance(value, float) and math.isfinite(value):
+            return repr(value)
+        return self._bind(value)
+
+    def _path(self, row, path):
+        # type: (str, str) -> str
+        """ expression reading the (dotted) field path of `row` """
+        if "." not in path:
+            return "%s[%r]" % (row, path)
+        if path not in self._getters:
+            self._getters[path] = "_get%d" % next(self._counter)
+            self._prelude.append("%s = _path_getter(%r)" % (self._getters[path], path))
+        return "%s(%s)" % (self._getters[path], row)
+
+    def _predicate(self, when, value, row=None):
+        # type: (Dict, str, Optional[str]) -> str
+        name = self._shared.get(serializer_typing.PredicatePool.key(when)) if row == "row" else None
+        if name is None:
+            return self._condition(when, value)
+        return name
+
+    def _condition(self, when, value):
+        # type: (Dict, str) -> str
+        op = serializer_typing.predicate_op(when)
+        operand = when.get(op)
+        if operand is None and op in ("equal", "not_equal"):
+            op = "null" if op == "equal" else "not_null"
+        if op in _SET_PREDICATES:
+            members = serializer_typing.predicate_members(operand)
+            if members is not None:
+                return _SET_PREDICATES[op].format(v=value, when=self._bind(members, prefix="_set"))
+        return _PREDICATES[op].format(v=value, when=self._literal(operand))
+
+    def _transform(self, params, value, instance=None):
+        # type: (Dict, str, Optional[object]) -> str
+        """
+        returns the python expression applying the transform on `value`,
+        `value` is evaluated only once by the returned expression
+        """
+        _type = params["type"]
+        keys = set(params.keys()) - {"type"}
+        if _type in ("integer", "string", "bool") and not keys:
+            return "%s(%s)" % ({"integer": "int", "string": "str", "bool": "bool"}[_type], value)
+        if _type == "float" and keys == {"precision"}:
+            if params["precision"] is None:
+                # no rounding, as TypeFloat
+                return "float(str(%s))" % value
+            return "round(float(str(%s)), %s)" % (value, self._literal(params["precision"]))
+        if _type == "currency" and keys <= {"multiplier", "rounding"}:
+            return "round(float(%s) * %s, %s)" % (
+                value, self._literal(params["multiplier"]), self._literal(params.get("rounding", 2)))
+        if _type == "enum" and keys <= {"mappings", "on_error"}:
+            mappings = self._bind(params["mappings"], prefix="_enum")
+            on_error = params.get("on_error", _ENUM_ON_ERROR_TOKEN)
+            if on_error == _ENUM_ON_ERROR_TOKEN:
+                return "_enum_or_raise(%s, %s)" % (mappings, value)
+            return "%s.get(%s, %s)" % (mappings, value, self._literal(on_error))
+        if instance is None:
+            instance = serializer_typing.init_type(_type, params)
+        return "%s(%s)" % (self._bind(instance, prefix="_t"), value)
+
+    def _then(self, then, row, field):
+        # type: (Any, str, str) -> str
+        """ expression of a case / ignore `then` clause """
+        if not isinstance(then, dict):
+            return self._literal(then)
+        params = dict(then)
+        if "field" not in params and \
+                getattr(serializer_typing.get_type(params["type"]), "has_record_access", False):
+            return self._transform(params, row)
+        source = params.pop("field", field)
+        return self._transform(params, self._path(row, source))
+
+    # ------------------------------------------------------------------
+    #                       field emitters
+    # ------------------------------------------------------------------
+
+    def _object(self, path):
+        # type: (str) -> str
+        """
+        variable of the resolved "object" path, emitted on its first use
+        and walked from the longest prefix resolved before
+        """
+        if path not in self._object_vars:
+            parent, rest = _serializer._split_object_path(path, self._object_vars)
+            source = "row" if parent is None else self._object_vars[parent]
+            name = "_o%d" % next(self._counter)
+            if parent is None and "." not in rest:
+                self._emit("%s = row[%r] if %r in row else _NOT_FOUND" % (name, rest, rest))
+            else:
+                accessor = "_acc%d" % next(self._counter)
+                self._prelude.append("%s = _object_accessor(%r)" % (accessor, rest))
+                self._emit("%s = %s(%s)" % (name, accessor, source))
+            self._object_vars[path] = name
+        return self._object_vars[path]
+
+    def _emit_case(self, target, params, row, depth):
+        # type: (str, Dict, str, int) -> None
+        for i, case in enumerate(params["cases"]):
+            when = case["when"]
+            value = "%s[%r]" % (row, when["field"])
+            self._emit("%s %r in %s and %s:" % ("if" if i == 0 else "elif",
+                                               when["field"], row,
+                                               self._predicate(when, value, row)), depth)
+            self._emit("%s = %s" % (target, self._then(case["then"], row, when["field"])), depth + 1)
+        if params["cases"]:
+            self._emit("else:", depth)
+            depth += 1
+        self._emit("%s = %s" % (target, self._literal(params.get("default"))), depth)
+
+    def _emit_value(self, target, field, row, instance, depth):
+        params = field["transform"]
+        interned = None
+        if isinstance(instance, serializer_typing.InternedTransform):
+            # the transform is inlined as usual, its output interned after
+            interned, instance = instance, instance.transform
+        if params["type"] == "case":
+            self._emit_case(target, params, row, depth)
+        else:
+            value = row if "from" not in field else self._path(row, field["from"])
+            self._emit("%s = %s" % (target, self._transform(params, value, instance)), depth)
+        if interned is not None:
+            self._emit("%s = %s(%s)" % (target, self._bind(interned.intern, prefix="_intern"), target), depth)
+
+    def _emit_ignored(self, target, field, row, instance, depth):
+        if "ignore" not in field:
+            self._emit_value(target, field, row, instance, depth)
+            return
+        when, then = field["ignore"]["when"], field["ignore"]["then"]
+        self._emit("try:", depth)
+        self._emit("_p = %s" % self._path(row, when["field"]), depth + 1)
+        self._emit("_hit = %s" % self._predicate(when, "_p", row), depth + 1)
+        self._emit("if _hit:", depth + 1)
+        self._emit("%s = %s" % (target, self._then(then, row, when["field"])), depth + 2)
+        self._emit("except KeyError:", depth)
+        self._emit("# field will be set to none if it is not found", depth + 1)
+        self._emit("_hit = True", depth + 1)
+        self._emit("%s = None" % target, depth + 1)
+        self._emit("if not _hit:", depth)
+        self._emit_value(target, field, row, instance, depth + 1)
+
+    def _emit_inline(self, field, target):
+        instance = self._serializer.get_serializer(_serializer._INLINE_TOKEN, field["name"])
+        if "object" not in field:
+            self._emit_ignored(target, field, "row", instance, 1)
+            return
+        inner = self._object(field["object"])
+        self._emit("if %s is _NOT_FOUND:" % inner)
+        self._emit("%s = None" % target, 2)
+        self._emit("else:")
+        self._emit_ignored(target, field, inner, instance, 2)
+
+    def _emit_derived(self, field):
+        instance = self._serializer.get_serializer(_serializer._DERIVED_TOKEN, field["name"])
+        self._emit_ignored("store[%r]" % field["name"], field, "store", instance, 1)
+
+    def _nested(self, field, dict_normalize):
+        nested = self._serializer.get_serializer(field["type"], field["name"])
+        name = "_nested%d" % next(self._counter)
+        self._children[name] = SerializerCodegen(nested, dict_normalize=dict_normalize)
+        return name
+
+    # ------------------------------------------------------------------
+    #                           compile
+    # ------------------------------------------------------------------
+
+    def _share_conditions(self):
+        """
+        evaluates the conditions on the row used by several fields once, up
+        front; comparisons are left in place as they may raise on values
+        the branches before them would have skipped
+        """
+        whens = {}
+        for when in _serializer._iter_conditions({
+                _serializer._INLINE_TOKEN: [
+                    field for field in self._serializer.config.get(_serializer._INLINE_TOKEN, [])
+                    if "object" not in field and field.get("type") not in ("array", "extended_array")]}):
+            if serializer_typing.predicate_op(when) not in _EAGER_PREDICATES or "." in when["field"]:
+                continue
+            whens.setdefault(serializer_typing.PredicatePool.key(when), []).append(when)
+        for key, shared in sorted(whens.items()):
+            if len(shared) < 2:
+                continue
+            when, name = shared[0], "_w%d" % next(self._counter)
+            self._emit("%s = %r in row and bool(%s)" % (
+                name, when["field"], self._condition(when, "row[%r]" % when["field"])))
+            self._shared[key] = name
+
+    def compile(self):
+        self._lines.append("def serialize(row, store=None, reuse=False):")
+        self._share_conditions()
+        outputs = []
+        for field in self._serializer.config.get(_serializer._INLINE_TOKEN, []):
+            _type = field.get("type")
+            self._emit("# %s" % field["name"])
+            if _type == "extended_array":
+                # only the last extended_array field fans out the records
+                self._extend = True
+                view = field.get("view", False)
+                nested = self._nested(field, dict_normalize=self._dict_normalize and not view)
+                self._emit("_ext = %s(%s(row[%r]))" % (
+                    "_extend_views" if view else "_extend_records", nested, field["from"]))
+                continue
+            target = "_f%d" % len(outputs)
+            outputs.append((field["name"], target))
+            if _type == "array":
+                nested = self._nested(field, dict_normalize=False)
+                self._emit("%s = list(%s(row[%r]))" % (target, nested, field["from"]))
+                continue
+            self._emit_inline(field, target)
+
+        self._emit("_out = {%s}" % ", ".join("%r: %s" % output for output in outputs))
+        if self._dict_normalize:
+            self._bound["_template"] = dict.fromkeys(self._serializer.get_master_keys())
+            self._emit("if reuse:")
+            self._emit("# recycled buffer, reset to the normalized keys", 2)
+            self._emit("store.update(_template)", 2)
+            self._emit("store.update(_out)", 2)
+            self._emit("else:")
+            self._emit("_store = _template.copy()", 2)
+            self._emit("if store:", 2)
+            self._emit("_store.update(store)", 3)
+            self._emit("_store.update(_out)", 2)
+            self._emit("store = _store", 2)
+        else:
+            self._emit("if store is None:")
+            self._emit("store = _out", 2)
+            self._emit("else:")
+            self._emit("store.update(_out)", 2)
+
+        for field in self._serializer.config.get(_serializer._DERIVED_TOKEN, []):
+            self._emit("# %s" % field["name"])
+            self._emit_derived(field)
+
+        constants = dict(
+            (field["name"], self._serializer.get_serializer(_serializer._CONSTANTS_TOKEN, field["name"])())
+            for field in self._serializer.config.get(_serializer._CONSTANTS_TOKEN, [])
+        )
+        if constants:
+            self._emit("store.update(%s)" % self._bind(constants))
+        self._emit("return _ext(store)" if self._extend else "return store")
+
+        self.source = "\n".join(self._prelude + self._lines) + "\n"
+        self._code = compile(self.source, self._filename(), "exec")
+        self._exec()
+
+    def _filename(self):
+        return "<serializer-codegen-%s>" % hashlib.sha1(self.source.encode("utf-8")).hexdigest()[:12]
+
+    def _exec(self):
+        namespace = {
+            "_NOT_FOUND": _serializer._NESTED_OBJECT_NOT_FOUND,
+            "_enum_or_raise": _enum_or_raise,
+            "_extend_records": _serializer.Serializer._extend_records,
+            "_extend_views": _serializer.Serializer._extend_views,
+            "_object_accessor": _serializer._mk_object_accessor,
+            "_path_getter": serializer_typing.path_getter,
+        }
+        namespace.update(self._bound)
+        for name, child in self._children.items():
+            namespace[name] = child.serialize_records
+        # makes the generated source visible in tracebacks
+        linecache.cache[self._filename()] = (len(self.source), None,
+                                             self.source.splitlines(True), self._filename())
+        exec(self._code, namespace)
+        self.serialize = namespace["serialize"]
+
+    def dump(self):
+        # type: () -> Dict
+        """
+        returns the compiled serializer as plain data, the code object is
+        marshalled and the bound constants are left for the caller to pickle
+        """
+        return {
+            "source": self.source,
+            "code": marshal.dumps(self._code),
+            "bound": self._bound,
+            "children": dict((name, child.dump()) for name, child in self._children.items()),
+            "dict_normalize": self._dict_normalize,
+            "extend": self._extend is not None,
+        }
+
+    @classmethod
+    def load(cls, entry):
+        # type: (Dict) -> SerializerCodegen
+        """
+        rebuilds a compiled serializer from `dump` output without
+        re-reading the config
+        """
+        self = cls.__new__(cls)
+        self._serializer = None
+        self._dict_normalize = entry["dict_normalize"]
+        self._extend = True if entry["extend"] else None
+        self.source = entry["source"]
+        self._code = marshal.loads(entry["code"])
+        self._bound = entry["bound"]
+        # the normalized store, bound into the code with dict_normalize
+        self._template = self._bound.get("_template")
+        self._children = dict((name, cls.load(child)) for name, child in entry["children"].items())
+        self._exec()
+        return self
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+import collections
+import itertools
+import queue
+import threading
+
+from adapt.serializer import serializer as _serializer
+
+
+__all__ = [
+    "MultiSerializer"
+]
+
+# chunks of serialized records queued for an exporter, before the
+# serialization waits for it
+_MAX_PENDING_CHUNKS = 4
+
+# end of the records of an exporter
+_DONE = object()
+
+
+class _Aborted(Exception):
+    pass
+
+
+def _tags(configs):
+    # type: (Any[Dict[str, Dict], List[Dict]]) -> collections.OrderedDict
+    """ configs by tag, a list is tagged by the export filename of the configs """
+    if isinstance(configs, dict):
+        return collections.OrderedDict(configs)
+    tagged = collections.OrderedDict()
+    for i, config in enumerate(configs):
+        tag = config.get("export", {}).get("filename") or str(i)
+        if tag in tagged:
+            raise ValueError("Duplicate serializer tag: {!r}".format(tag))
+        tagged[tag] = config
+    return tagged
+
+
+def _default_exporter(config, records):
+    from adapt.utils.exporter import CSVExporter
+    return CSVExporter.lazy_run(config, records)
+
+
+class _ExporterThread(threading.Thread):
+    """ runs an exporter on the records of one config, fed through a bounded queue """
+
+    def __init__(self, tag, exporter, config, max_pending):
+        # type: (str, Callable, Dict, int) -> None
+        super(_ExporterThread, self).__init__(name="exporter-{}".format(tag), daemon=True)
+        self.tag = tag
+        self.exporter = exporter
+        self.config = config
+        self.chunks = queue.Queue(maxsize=max_pending)
+        self.result = None
+        self.error = None
+
+    def _records(self):
+        while True:
+            chunk = self.chunks.get()
+            if chunk is _DONE:
+                return
+            if isinstance(chunk, _Aborted):
+                raise chunk
+            for record in chunk:
+                yield record
+
+    def run(self):
+        try:
+            self.result = self.exporter(self.config, self._records())
+        except BaseException as e:
+            self.error = e
+            # unblocks the serialization waiting on the queue
+            while True:
+                try:
+                    self.chunks.get_nowait()
+                except queue.Empty:
+                    break
+
+    def put(self, chunk):
+        # type: (Any) -> None
+        while self.error is None:
+            if not self.is_alive():
+                # the exporter returned without reading all of its records
+                return
+            try:
+                self.chunks.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise self.error
+
+
+class MultiSerializer(object):
+    """
+    Serializes one stream of raw records with several configs in a single
+    pass, e.g. the campaign dimension, the budget facts and the daily
+    metrics of the same API response.
+
+    The raw records are read once, in chunks of `chunk_size`, and every
+    chunk is serialized by each config in turn. `serialize_records` yields
+    the outputs tagged by config, `export` streams the outputs of each
+    config to its own exporter.
+    """
+
+    def __init__(self, serializers, chunk_size=_serializer._PARALLEL_CHUNK_SIZE, batch_size=None):
+        # type: (Dict[str, _serializer.Serializer], int, Optional[int]) -> None
+        self.serializers = collections.OrderedDict(serializers)
+        self.chunk_size = int(chunk_size)
+        if self.chunk_size < 1:
+            raise ValueError("chunk_size must be positive: {!r}".format(chunk_size))
+        self.batch_size = batch_size
+
+    @classmethod
+    def init(cls, configs, dict_normalize=False, backend=_serializer._PLAN_BACKEND, cache_dir=None,
+             compact=False, project=None, chunk_size=_serializer._PARALLEL_CHUNK_SIZE, batch_size=None):
+        # type: (Any[Dict[str, Dict], List[Dict]], bool, str, Optional[str], bool, Any[bool, List[str]], int, Optional[int]) -> MultiSerializer
+        """
+        `configs` by tag, or a list of configs tagged by their export
+        filename; the other arguments apply to every config, as in
+        `Serializer.init`
+        """
+        serializers = collections.OrderedDict(
+            (tag, _serializer.Serializer.init(config, dict_normalize=dict_normalize, backend=backend,
+                                              cache_dir=cache_dir, compact=compact, project=project))
+            for tag, config in _tags(configs).items())
+        return cls(serializers, chunk_size=chunk_size, batch_size=batch_size)
+
+    def _chunks(self, records):
+        # type: (Any) -> Generator[List[Tuple[str, List]], None, None]
+        """ the outputs of every config, per chunk of raw records """
+        records = iter(records)
+        # each config skips the duplicates on its own `unique_on_source`,
+        # over the whole stream
+        filters = collections.OrderedDict(
+            (tag, serializer.source_filter()) for tag, serializer in self.serializers.items())
+        try:
+            while True:
+                chunk = list(itertools.islice(records, self.chunk_size))
+                if not chunk:
+                    return
+                yield [(tag, list(serializer.serialize_records(chunk, batch_size=self.batch_size,
+                                                               dedupe=filters[tag] or False)))
+                       for tag, serializer in self.serializers.items()]
+        finally:
+            for source_filter in filters.values():
+                if source_filter is not None:
+                    source_filter.report()
+
+    def serialize_records(self, records):
+        # type: (Any[List[dict], Generator]) -> Generator[Tuple[str, Any], None, None]
+        """ yields (tag, record) for the outputs of every config """
+        for outputs in self._chunks(records):
+            for tag, rows in outputs:
+                for row in rows:
+                    yield tag, row
+
+    def export(self, records, exporter=None, max_pending=_MAX_PENDING_CHUNKS):
+        # type: (Any[List[dict], Generator], Optional[Callable], int) -> Dict[str, Any]
+        """
+        streams the outputs of each config to `exporter(config, records)`
+        (default: CSVExporter.lazy_run), each running on its own thread,
+        and returns the results of the exporters by tag. At most
+        `max_pending` chunks wait for an exporter, which bounds the memory
+        held when one is slower than the others. If an exporter or the
+        serialization fails, every exporter is stopped and the error raised.
+        """
+        exporter = exporter or _default_exporter
+        threads = collections.OrderedDict(
+            (tag, _ExporterThread(tag, exporter, serializer.config, max_pending))
+            for tag, serializer in self.serializers.items())
+        for thread in threads.values():
+            thread.start()
+        try:
+            for outputs in self._chunks(records):
+                for tag, rows in outputs:
+                    threads[tag].put(rows)
+            for thread in threads.values():
+                thread.put(_DONE)
+        except BaseException as e:
+            # the exporters fail too, instead of closing partial outputs as complete
+            for thread in threads.values():
+                try:
+                    thread.put(_Aborted("serialization failed: {!r}".format(e)))
+                except BaseException:
+                    pass
+            raise
+        finally:
+            for thread in threads.values():
+                thread.join()
+        for thread in threads.values():
+            if thread.error is not None:
+                raise thread.error
+        return collections.OrderedDict((tag, thread.result) for tag, thread in threads.items())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+from typing import Any, Dict, Generator, List, Optional
+from concurrent import futures
+import collections
+import itertools
+
+from adapt.serializer import serializer as _serializer
+
+
+__all__ = [
+    "ParallelSerializer"
+]
+
+# serializer built once per worker process by the pool initializer
+_WORKER_SERIALIZER = None
+
+
+def _init_worker(config, dict_normalize, backend, cache_dir, batch_size, compact):
+    # type: (Dict, bool, str, Optional[str], Optional[int], bool) -> None
+    global _WORKER_SERIALIZER
+    serializer = _serializer.Serializer.init(config, dict_normalize=dict_normalize,
+                                             backend=backend, cache_dir=cache_dir,
+                                             compact=compact)
+    _WORKER_SERIALIZER = (serializer, batch_size)
+
+
+def _serialize_chunk(rows):
+    # type: (List[dict]) -> List[dict]
+    serializer, batch_size = _WORKER_SERIALIZER
+    # the records are deduplicated by the parent, before being chunked
+    return list(serializer.serialize_records(rows, batch_size=batch_size, dedupe=False))
+
+
+def _chunks(records, chunk_size):
+    # type: (Any, int) -> Generator[List[dict], None, None]
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ParallelSerializer(object):
+    """
+    Serializes records on a pool of worker processes.
+
+    Raw records are cut into chunks of `chunk_size` and shipped to the
+    workers, each holding a serializer built once from the config. At most
+    `max_in_flight` chunks are submitted and not yet consumed, which bounds
+    the memory held by the pool when the records come from a generator.
+    With `ordered` the records are yielded in the input order, otherwise
+    chunks are yielded as soon as they are done.
+    """
+
+    def __init__(self, config, workers=None, chunk_size=_serializer._PARALLEL_CHUNK_SIZE, ordered=True,
+                 max_in_flight=None, dict_normalize=False, backend=_serializer._PLAN_BACKEND,
+                 cache_dir=None, batch_size=None, compact=False):
+        # type: (Dict, Optional[int], int, bool, Optional[int], bool, str, Optional[str], Optional[int], bool) -> None
+        import os
+        self.config = config
+        self.workers = int(workers or os.cpu_count() or 1)
+        self.chunk_size = int(chunk_size)
+        if self.chunk_size < 1:
+            raise ValueError("chunk_size must be positive: {!r}".format(chunk_size))
+        self.ordered = ordered
+        self.max_in_flight = int(max_in_flight or 2 * self.workers)
+        self.initargs = (config, dict_normalize, backend, cache_dir, batch_size, compact)
+
+    def _executor(self):
+        # type: () -> futures.ProcessPoolExecutor
+        return futures.ProcessPoolExecutor(max_workers=self.workers,
+                                           initializer=_init_worker,
+                                           initargs=self.initargs)
+
+    def serialize_records(self, records):
+        # type: (Any[List[dict], Generator]) -> Generator
+        chunks = _chunks(records, self.chunk_size)
+        pending = collections.deque()
+        executor = self._executor()
+        try:
+            for chunk in itertools.islice(chunks, self.max_in_flight):
+                pending.append(executor.submit(_serialize_chunk, chunk))
+            while pending:
+                if self.ordered:
+                    done = pending.popleft()
+                else:
+                    completed, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                    done = completed.pop()
+                    pending.remove(done)
+                records = done.result()
+                # refill before handing the records out, workers stay busy
+                for chunk in itertools.islice(chunks, 1):
+                    pending.append(executor.submit(_serialize_chunk, chunk))
+                for record in records:
+                    yield record
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+from typing import Any, Callable, Dict, List, Optional
+import json
+import time
+
+from adapt.serializer import serializer as _serializer
+
+
+__all__ = [
+    "SerializerProfile"
+]
+
+
+class _FieldStats(object):
+
+    __slots__ = ("name", "kind", "transform", "calls", "time", "ignored", "errors")
+
+    def __init__(self, name, kind, transform):
+        # type: (str, str, str) -> None
+        self.name = name
+        self.kind = kind
+        self.transform = transform
+        self.calls = 0
+        self.time = 0
+        self.ignored = 0
+        self.errors = 0
+
+    def as_dict(self):
+        # type: () -> Dict[str, Any]
+        return {
+            "field": self.name,
+            "kind": self.kind,
+            "transform": self.transform,
+            "calls": self.calls,
+            "time_ms": round(self.time / 1e6, 3),
+            "avg_us": round(self.time / 1e3 / self.calls, 3) if self.calls else 0.0,
+            "ignored": self.ignored,
+            "errors": self.errors,
+        }
+
+
+class SerializerProfile(_serializer._SerializerPlan):
+    """
+    Instrumented variant of the execution plan.
+
+    Every step is wrapped to count its calls, cumulative time, ignore hits
+    and exceptions per field. The report is printed, sorted by time, when
+    `serialize_records` ends, and written as JSON to `report_path` when
+    given. The regular plan is left untouched, so profiling costs nothing
+    unless this variant is built.
+
+    Nested `array` / `extended_array` fields are reported as a whole; the
+    children of an `extended_array` are serialized lazily, while they are
+    consumed, so only the setup is timed for them.
+    """
+
+    def __init__(self, serializer, dict_normalize=False, report_path=None):
+        # type: (_serializer._SerializerTyping, Optional[bool], Optional[str]) -> None
+        self._stats = {}
+        self._report_path = report_path
+        super(SerializerProfile, self).__init__(serializer, dict_normalize=dict_normalize)
+
+    def _field_stats(self, field, kind):
+        # type: (dict, str) -> _FieldStats
+        name = field["name"]
+        if name not in self._stats:
+            transform = field.get("type") or field.get("transform", {}).get("type", "")
+            self._stats[name] = _FieldStats(name, kind, transform)
+        return self._stats[name]
+
+    @staticmethod
+    def _timed(step, stats):
+        # type: (Callable, _FieldStats) -> Callable
+        timer = time.perf_counter_ns
+
+        def timed(*args):
+            start = timer()
+            try:
+                return step(*args)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                stats.calls += 1
+                stats.time += timer() - start
+        return timed
+
+    def _mk_ignore(self, field):
+        # type: (dict) -> Optional[Callable]
+        ignored = super(SerializerProfile, self)._mk_ignore(field)
+        if ignored is None:
+            return None
+        stats = self._field_stats(field, self._kind(field))
+
+        def counted(row, store):
+            hit = ignored(row, store)
+            if hit:
+                stats.ignored += 1
+            return hit
+        return counted
+
+    def _kind(self, field):
+        # type: (dict) -> str
+        for token in (_serializer._INLINE_TOKEN, _serializer._DERIVED_TOKEN):
+            if any(field is _field for _field in self._serializer.config.get(token, [])):
+                return token
+        return _serializer._INLINE_TOKEN
+
+    def _mk_array_step(self, field):
+        step = super(SerializerProfile, self)._mk_array_step(field)
+        return self._timed(step, self._field_stats(field, _serializer._INLINE_TOKEN))
+
+    def _mk_extend_step(self, field):
+        step = super(SerializerProfile, self)._mk_extend_step(field)
+        return self._timed(step, self._field_stats(field, _serializer._INLINE_TOKEN))
+
+    def _mk_inline_step(self, field):
+        step = super(SerializerProfile, self)._mk_inline_step(field)
+        return self._timed(step, self._field_stats(field, _serializer._INLINE_TOKEN))
+
+    def _mk_derived_step(self, field):
+        step = super(SerializerProfile, self)._mk_derived_step(field)
+        return self._timed(step, self._field_stats(field, _serializer._DERIVED_TOKEN))
+
+    def report(self):
+        # type: () -> List[Dict[str, Any]]
+        """ per field counters, the slowest field first """
+        stats = sorted(self._stats.values(), key=lambda _stats: _stats.time, reverse=True)
+        return [_stats.as_dict() for _stats in stats]
+
+    def format_report(self):
+        # type: () -> str
+        report = self.report()
+        total = sum(entry["time_ms"] for entry in report) or 1.0
+        lines = ["{:<32} {:<8} {:<14} {:>10} {:>12} {:>10} {:>6} {:>10} {:>8}".format(
+            "field", "kind", "transform", "calls", "time_ms", "avg_us", "%", "ignored", "errors")]
+        for entry in report:
+            lines.append("{:<32} {:<8} {:<14} {:>10} {:>12.3f} {:>10.3f} {:>6.1f} {:>10} {:>8}".format(
+                entry["field"], entry["kind"], entry["transform"], entry["calls"], entry["time_ms"],
+                entry["avg_us"], 100.0 * entry["time_ms"] / total, entry["ignored"], entry["errors"]))
+        return "\n".join(lines)
+
+    def dump_report(self):
+        print("[SERIALIZER] field profile:\n{}".format(self.format_report()))
+        if self._report_path:
+            with open(self._report_path, "w") as _file:
+                json.dump(self.report(), _file, indent=2)
+            print("[SERIALIZER] field profile written to: {!r}".format(self._report_path))
+
+    def serialize_records(self, records, recycle=False):
+        # type: (Any, Optional[bool]) -> Any
+        try:
+            for row in super(SerializerProfile, self).serialize_records(records, recycle=recycle):
+                yield row
+        finally:
+            # also reported when the run fails or stops early
+            self.dump_report()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+from typing import Any, Dict, List, Tuple
+
+
+__all__ = [
+    "Record",
+    "record_type"
+]
+
+# record classes by field names, shared by every serializer of the process
+_RECORD_TYPES = {}
+
+
+class Record(tuple):
+    """
+    Compact, immutable serializer output: the values of a row stored in a
+    tuple, in the field order of the record class. Fields are read by name
+    (`record["campaignid"]`, `record.get(...)`) or by position.
+    """
+
+    __slots__ = ()
+
+    _fields = ()  # type: Tuple[str, ...]
+    _index = {}  # type: Dict[str, int]
+
+    @classmethod
+    def from_store(cls, store):
+        # type: (Dict) -> Record
+        return tuple.__new__(cls, map(store.get, cls._fields))
+
+    def __getitem__(self, key):
+        if type(key) is str:
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def get(self, key, default=None):
+        # type: (str, Any) -> Any
+        index = self._index.get(key)
+        if index is None:
+            return default
+        return tuple.__getitem__(self, index)
+
+    def keys(self):
+        # type: () -> Tuple[str, ...]
+        return self._fields
+
+    def values(self):
+        # type: () -> Tuple
+        return tuple(self)
+
+    def items(self):
+        return zip(self._fields, self)
+
+    def materialize(self):
+        # type: () -> dict
+        return dict(zip(self._fields, self))
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, ", ".join(
+            "{}={!r}".format(key, value) for key, value in zip(self._fields, self)))
+
+    def __reduce__(self):
+        # record classes are created at runtime, rebuilt from the fields
+        return _rebuild, (self._fields, tuple(self))
+
+
+def record_type(fields, name="Record"):
+    # type: (List[str], str) -> type
+    """ returns the record class holding the given fields, in order """
+    fields = tuple(fields)
+    if len(set(fields)) != len(fields):
+        raise ValueError("Duplicate record fields: {!r}".format(fields))
+    if fields not in _RECORD_TYPES:
+        _RECORD_TYPES[fields] = type(name, (Record, ), {
+            "__slots__": (),
+            "_fields": fields,
+            "_index": dict((field, i) for i, field in enumerate(fields)),
+        })
+    return _RECORD_TYPES[fields]
+
+
+def _rebuild(fields, values):
+    # type: (Tuple[str, ...], Tuple) -> Record
+    return tuple.__new__(record_type(fields), values)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+from typing import Any, Callable, Dict, List, Optional
+import collections
+
+from adapt.serializer import serializer_typing
+
+
+__all__ = [
+    "Column",
+    "output_schema"
+]
+
+# logical types of the output columns; "date" values are strings in the
+# `format` of the column, "list" values the records of an `array` field
+STRING = "string"
+INTEGER = "integer"
+FLOAT = "float"
+BOOLEAN = "boolean"
+DATE = "date"
+LIST = "list"
+ANY = "any"
+
+
+class Column(object):
+    """
+    Output column of a serializer config: the logical type of its values,
+    whether they can be null, the number of decimals of the floats and the
+    format of the dates. The columns of the records of an `array` field
+    are its `children`. A `dictionary` column holds few distinct values,
+    worth writing as integer codes and a dictionary of the values.
+    """
+
+    __slots__ = ("name", "type", "nullable", "precision", "format", "children", "dictionary")
+
+    def __init__(self, name, type=ANY, nullable=True, precision=None, format=None, children=None,
+                 dictionary=False):
+        # type: (Optional[str], Optional[str], bool, Optional[int], Optional[str], Optional[List[Column]], bool) -> None
+        self.name = name
+        self.type = type
+        self.nullable = nullable
+        self.precision = precision
+        self.format = format
+        self.children = children
+        self.dictionary = dictionary
+
+    def renamed(self, name):
+        # type: (str) -> Column
+        return Column(name, type=self.type or ANY, nullable=self.nullable, precision=self.precision,
+                      format=self.format, children=self.children, dictionary=self.dictionary)
+
+    def as_dict(self):
+        # type: () -> Dict[str, Any]
+        column = collections.OrderedDict([
+            ("name", self.name),
+            ("type", self.type),
+            ("nullable", self.nullable),
+        ])
+        if self.precision is not None:
+            column["precision"] = self.precision
+        if self.format is not None:
+            column["format"] = self.format
+        if self.children is not None:
+            column["children"] = [child.as_dict() for child in self.children]
+        if self.dictionary:
+            column["dictionary"] = True
+        return column
+
+    def __eq__(self, other):
+        return isinstance(other, Column) and self.as_dict() == other.as_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "Column({})".format(", ".join(
+            "{}={!r}".format(key, value) for key, value in self.as_dict().items()))
+
+
+def _literal(value):
+    # type: (Any) -> Column
+    """ column of a literal of the config, a null has no type """
+    if value is None:
+        return Column(None, type=None, nullable=True)
+    if isinstance(value, bool):
+        _type = BOOLEAN
+    elif isinstance(value, int):
+        _type = INTEGER
+    elif isinstance(value, float):
+        _type = FLOAT
+    elif isinstance(value, str):
+        _type = STRING
+    elif isinstance(value, list):
+        _type = LIST
+    else:
+        _type = ANY
+    return Column(None, type=_type, nullable=False)
+
+
+def _union(columns):
+    # type: (List[Column]) -> Column
+    """ column holding the values of any of `columns` """
+    nullable = any(column.nullable for column in columns)
+    typed = [column for column in columns if column.type is not None]
+    types = set(column.type for column in typed)
+    if types == {INTEGER, FLOAT}:
+        # integers are written as floats of the precision of the others
+        typed = [column for column in typed if column.type == FLOAT]
+        types = {FLOAT}
+    if len(types) != 1:
+        return Column(None, type=ANY, nullable=nullable)
+    # literals have no precision or format of their own
+    precisions = set(column.precision for column in typed if column.precision is not None)
+    formats = set(column.format for column in typed if column.format is not None)
+    return Column(None, type=types.pop(), nullable=nullable,
+                  precision=precisions.pop() if len(precisions) == 1 else None,
+                  format=formats.pop() if len(formats) == 1 else None)
+
+
+def _then(then):
+    # type: (Any) -> Column
+    """ column of the `then` of a case or an ignore, a literal or a transform """
+    if isinstance(then, dict):
+        return _transform(then)
+    return _literal(then)
+
+
+def _float(params, key, default=None):
+    # type: (Dict, str, Optional[int]) -> Column
+    return Column(None, type=FLOAT, nullable=False, precision=params.get(key, default))
+
+
+def _date(params):
+    # type: (Dict) -> Column
+    return Column(None, type=DATE, nullable=False, format=params["format"]["output"])
+
+
+def _enum(params):
+    # type: (Dict) -> Column
+    values = [_literal(value) for value in params["mappings"].values()]
+    if "on_error" in params:
+        values.append(_literal(params["on_error"]))
+    return _union(values)
+
+
+def _case(params):
+    # type: (Dict) -> Column
+    columns = [_then(case.get("then")) for case in params.get("cases", [])]
+    columns.append(_literal(params.get("default")))
+    return _union(columns)
+
+
+def _ratio(params):
+    # type: (Dict) -> Column
+    return _union([_float(params, "precision", 2), _literal(params.get("default", 0.0))])
+
+
+def _expression(params):
+    # type: (Dict) -> Column
+    if params.get("precision") is None:
+        # any python value, including null
+        return Column(None, type=ANY, nullable=True)
+    return _union([_float(params, "precision"), _literal(params.get("default"))])
+
+
+def _lookup(params):
+    # type: (Dict) -> Column
+    cast = params.get("cast")
+    if isinstance(cast, str):
+        cast = {"type": cast}
+    if cast is not None:
+        found = _transform(cast)
+    elif str(params["source"]).lower().endswith(serializer_typing._SQLITE_SUFFIXES):
+        found = Column(None, type=ANY, nullable=True)
+    else:
+        # values of csv tables are read as strings
+        found = Column(None, type=STRING, nullable=False)
+    return _union([found, _literal(params.get("default"))])
+
+
+def _simple(_type):
+    # type: (str) -> Callable[[Dict], Column]
+    return lambda params: Column(None, type=_type, nullable=False)
+
+
+# derivation of the output column of the built-in transforms by type
+_TRANSFORMS = {
+    "string": _simple(STRING),
+    "integer": _simple(INTEGER),
+    "bool": _simple(BOOLEAN),
+    "float": lambda params: _float(params, "precision"),
+    "currency": lambda params: _float(params, "rounding", 2),
+    "date": _date,
+    "date_parser": _date,
+    "enum": _enum,
+    "case": _case,
+    "ratio": _ratio,
+    "expression": _expression,
+    "lookup": _lookup,
+}
+
+
+def _transform(params):
+    # type: (Dict) -> Column
+    """
+    column of the output of a transform; a custom transform declares the
+    logical type of its values with a `logical_type` attribute
+    """
+    derive = _TRANSFORMS.get(params["type"])
+    if derive is not None:
+        return derive(params)
+    transform = serializer_typing.get_type(params["type"])
+    return Column(None, type=getattr(transform, "logical_type", ANY), nullable=True)
+
+
+def _field(field):
+    # type: (Dict) -> Column
+    column = _transform(field["transform"])
+    columns = [column]
+    if "object" in field:
+        # null when the nested object is not found
+        columns.append(_literal(None))
+    if "ignore" in field:
+        columns.append(_then(field["ignore"].get("then")))
+    if len(columns) > 1:
+        column = _union(columns)
+    column = column.renamed(field["name"])
+    # enums map to a fixed set of values, other fields opt in
+    column.dictionary = bool(field.get("dictionary", field["transform"]["type"] == "enum"))
+    return column
+
+
+def _columns(config, dict_normalize, nested):
+    # type: (Dict, bool, bool) -> collections.OrderedDict
+    """
+    the output columns of a config by name, in the config order; a field
+    defined again, e.g. derived from an inline field of the same name,
+    replaces the first definition and keeps its position
+    """
+    columns = collections.OrderedDict()
+    for field in config.get("inline", []):
+        _type = field.get("type")
+        if _type == "extended_array":
+            # the fanned out records carry the fields of the nested config,
+            # the parent record is yielded first, without them
+            for name, column in _columns(field, dict_normalize, nested).items():
+                column.nullable = True
+                columns[name] = column
+        elif _type == "array":
+            children = list(_columns(field, False, True).values())
+            if not nested:
+                columns[field["name"]] = Column(field["name"], type=LIST, nullable=False,
+                                                children=children)
+            if dict_normalize:
+                # normalized stores hold the keys of nested arrays, never set
+                for child in children:
+                    columns.setdefault(child.name, Column(child.name, type=ANY, nullable=True))
+        else:
+            columns[field["name"]] = _field(field)
+    for field in config.get("derived", []):
+        columns[field["name"]] = _field(field)
+    for field in config.get("constants", []):
+        columns[field["name"]] = _literal(field["value"]).renamed(field["name"])
+    return columns
+
+
+def output_schema(config, dict_normalize=False, fields=None):
+    # type: (Dict, bool, Optional[List[str]]) -> List[Column]
+    """
+    the output columns of a config, derived from the transforms of its
+    fields. The `export.fields` come first, in their order, like in the
+    compact records; `fields` selects and orders the columns instead, a
+    field the config does not output is a nullable column of any type.
+    """
+    columns = _columns(config, dict_normalize, False)
+    if fields is None:
+        fields = list(config.get("export", {}).get("fields", []))
+        exported = set(fields)
+        fields.extend(name for name in columns if name not in exported)
+    return [columns[name] if name in columns else Column(name, type=ANY, nullable=True)
+            for name in fields]
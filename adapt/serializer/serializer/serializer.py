@@ -15,14 +15,17 @@
 # * limitations under the License.
 # **************************************************************************/
 
-from typing import Any, Dict, List, Optional, Tuple, Generator
+from typing import Any, Callable, Dict, List, Optional, Tuple, Generator
+from collections.abc import MutableMapping
+from functools import lru_cache
 import inspect
 
 from adapt.serializer import serializer_typing
 
 
 __all__ = [
-    "Serializer"
+    "Serializer",
+    "ExtendedRecord"
 ]
 
 
@@ -35,6 +38,81 @@ _DERIVED_TOKEN = "derived"
 _CONSTANTS_TOKEN = "constants"
 _IGNORE_TOKEN = "ignore"
 
+_INTERPRETER_BACKEND = "interpreter"
+_PLAN_BACKEND = "plan"
+_CODEGEN_BACKEND = "codegen"
+
+_PARALLEL_CHUNK_SIZE = 1000
+
+_IGNORE_POISON_PILL = "##$IGNORE_PIL"
+_NESTED_OBJECT_NOT_FOUND = "#$OBJECT_NOT_FOUND$"
+
+
+class ExtendedRecord(MutableMapping):
+    """
+    Record fanned out of an `extended_array` field in view mode.
+
+    The fields of the child record are layered on the store of its parent,
+    which is shared by all the children instead of being copied into each
+    of them. Like in the copy mode, a parent field takes precedence over a
+    child field of the same name. Writes go to the child; writing or
+    deleting a field held by a parent first resolves the record into a
+    copy of its own. `materialize` resolves the view into a plain dict.
+    """
+
+    __slots__ = ("maps", )
+
+    def __init__(self, *maps):
+        # type: (Dict) -> None
+        self.maps = maps
+
+    def __getitem__(self, key):
+        # the maps go from the child to the outermost parent
+        for mapping in reversed(self.maps):
+            if key in mapping:
+                return mapping[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        for mapping in self.maps:
+            if key in mapping:
+                return True
+        return False
+
+    def _own(self, key):
+        # type: (Any) -> dict
+        """ the mapping a write of `key` goes to, without touching the shared parents """
+        if any(key in mapping for mapping in self.maps[1:]):
+            self.maps = (self.materialize(), )
+        return self.maps[0]
+
+    def __setitem__(self, key, value):
+        self._own(key)[key] = value
+
+    def __delitem__(self, key):
+        del self._own(key)[key]
+
+    def __iter__(self):
+        return iter(self.materialize())
+
+    def __len__(self):
+        return len(self.materialize())
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__, self.materialize())
+
+    def __reduce__(self):
+        return self.__class__, self.maps
+
+    def materialize(self):
+        # type: () -> dict
+        # the key order of the child first and the values of the parents,
+        # like the records of the copy mode
+        record = {}
+        for mapping in self.maps:
+            record.update(mapping)
+        return record
+
 
 class _SerializerTyping(object):
     """
@@ -42,13 +120,17 @@ class _SerializerTyping(object):
     till the end of the serialization process.
     """
 
-    def __init__(self, config, key_stack=None):
-        # type: (dict, set) -> None
+    def __init__(self, config, key_stack=None, predicates=None):
+        # type: (dict, set, serializer_typing.PredicatePool) -> None
         self.config = config
         self._serializers = {}
         self._keys = set()
         # key_stack is used to keep track of all the keys
         self._key_stack = set() if key_stack is None else key_stack
+        # case / ignore conditions repeated across fields are evaluated once
+        self._predicates = predicates
+        if predicates is None:
+            self._predicates = serializer_typing.PredicatePool(_iter_conditions(config))
         self.make()
         self._update_key_stack(self._keys)
 
@@ -84,17 +166,20 @@ class _SerializerTyping(object):
         self._mk_constant(_CONSTANTS_TOKEN)
 
     @classmethod
-    def _init(cls, config, key_stack=None):
-        return cls(config, key_stack=key_stack)
+    def _init(cls, config, key_stack=None, predicates=None):
+        return cls(config, key_stack=key_stack, predicates=predicates)
 
     def _mk_serializer(self, token):
         for field in self.config.get(token, []):
             if "type" in field and field["type"] in ("array", "extended_array"):
-                serializer = self._init(config=field, key_stack=self._key_stack)
+                serializer = self._init(config=field, key_stack=self._key_stack,
+                                        predicates=self._predicates)
                 self._add_serializer(field["type"], field["name"], serializer)
                 self._update_keys(serializer.get_keys())
                 continue
             f = self._get_transformer(field["transform"]["type"], field["transform"])
+            if field.get("dictionary"):
+                f = serializer_typing.InternedTransform(f)
             self._add_serializer(token, field["name"], f)
             self._mk_ignore(field, token=_IGNORE_TOKEN)
 
@@ -111,20 +196,391 @@ class _SerializerTyping(object):
             self._add_serializer(token, field["name"], f)
 
     def _get_transformer(self, name, field):
+        if name in ("case", "ignore"):
+            field = dict(field, predicates=self._predicates)
         return serializer_typing.init_type(name, field)
 
 
-class Serializer(object):
+def _iter_conditions(config):
+    # type: (dict) -> Generator[dict, None, None]
+    """ yields the `when` conditions of the case / ignore fields of a config """
+    for token in (_INLINE_TOKEN, _DERIVED_TOKEN):
+        for field in config.get(token, []):
+            if field.get("type") in ("array", "extended_array"):
+                for when in _iter_conditions(field):
+                    yield when
+                continue
+            if field.get("transform", {}).get("type") == "case":
+                for case in field["transform"].get("cases", []):
+                    yield case["when"]
+            if "ignore" in field:
+                when = field["ignore"]["when"]
+                # same defaulting as _SerializerTyping._mk_ignore
+                yield dict(when, field=when.get("field") or field.get("from"))
+
+
+@lru_cache(maxsize=None)
+def _mk_object_accessor(path):
+    # type: (Optional[str]) -> Optional[Callable]
     """
-    Serializes the given records based on the config definition.
+    builds an accessor for the dotted "object" path of a field, the path is
+    split only once and the accessor walks the row on each call; a missing
+    key or a non object at any level resolves to `_NESTED_OBJECT_NOT_FOUND`
+    """
+    if path is None:
+        return None
+    keys = tuple(path.split("."))
+
+    def accessor(row):
+        try:
+            for key in keys:
+                if key not in row:
+                    return _NESTED_OBJECT_NOT_FOUND
+                row = row[key]
+        except TypeError:
+            return _NESTED_OBJECT_NOT_FOUND
+        return row
+    return accessor
+
+
+def _split_object_path(path, resolved):
+    # type: (str, Dict[str, Any]) -> Tuple[Optional[str], str]
+    """
+    splits an "object" path into its longest prefix already resolved and
+    the rest of the path to walk from it
+    """
+    keys = path.split(".")
+    for i in range(len(keys) - 1, 0, -1):
+        prefix = ".".join(keys[:i])
+        if prefix in resolved:
+            return prefix, ".".join(keys[i:])
+    return None, path
+
+
+class _SerializerPlan(object):
     """
+    Compiled form of a `_SerializerTyping`.
 
-    _NESTED_OBJECT_NOT_FOUND = "#$OBJECT_NOT_FOUND$"
+    The config is walked only once and every field is reduced to a prebound
+    step (accessor, ignore predicate, transform and output slot), so that
+    serializing a row does no config introspection at all. The "object"
+    paths of the fields are resolved once per row, each from its longest
+    prefix shared with another field.
+    """
 
     def __init__(self, serializer, dict_normalize=False):
         # type: (_SerializerTyping, Optional[bool]) -> None
         self._serializer = serializer
         self._dict_normalize = dict_normalize
+        self._template = None
+        self._inline = []
+        self._extend = None
+        self._derived = []
+        self._constants = {}
+        # (index of the parent object, accessor), the row itself is object 0
+        self._accessors = []
+        self._objects = {}
+        self.compile()
+
+    def compile(self):
+        if self._dict_normalize:
+            self._template = dict.fromkeys(self._serializer.get_master_keys())
+        for field in self._serializer.config.get(_INLINE_TOKEN, []):
+            _type = field.get("type")
+            if _type == "array":
+                self._inline.append((0, self._mk_array_step(field)))
+            elif _type == "extended_array":
+                # only the last extended_array field fans out the records
+                self._extend = self._mk_extend_step(field)
+            else:
+                self._inline.append((self._mk_object(field.get("object")), self._mk_inline_step(field)))
+        for field in self._serializer.config.get(_DERIVED_TOKEN, []):
+            self._derived.append(self._mk_derived_step(field))
+        for field in self._serializer.config.get(_CONSTANTS_TOKEN, []):
+            transform = self._serializer.get_serializer(_CONSTANTS_TOKEN, field["name"])
+            self._constants[field["name"]] = transform()
+
+    def _mk_object(self, path):
+        # type: (Optional[str]) -> int
+        """ returns the index of the resolved "object" path in a row """
+        if path is None:
+            return 0
+        if path not in self._objects:
+            parent, rest = _split_object_path(path, self._objects)
+            self._accessors.append((self._objects.get(parent, 0), _mk_object_accessor(rest)))
+            self._objects[path] = len(self._accessors)
+        return self._objects[path]
+
+    def _resolve_objects(self, rows):
+        # type: (List[dict]) -> List[List]
+        """ the "object" paths resolved for every row, by object index """
+        objects = [rows]
+        for parent, accessor in self._accessors:
+            objects.append(list(map(accessor, objects[parent])))
+        return objects
+
+    def _mk_nested(self, field, dict_normalize):
+        # type: (dict, bool) -> Serializer
+        nested = self._serializer.get_serializer(field["type"], field["name"])
+        return Serializer(nested, dict_normalize=dict_normalize)
+
+    def _mk_array_step(self, field):
+        name, source = field["name"], field["from"]
+        serialize_records = self._mk_nested(field, dict_normalize=False).serialize_records
+
+        def step(row, store):
+            store[name] = list(serialize_records(row[source]))
+        return step
+
+    def _mk_extend_step(self, field):
+        source = field["from"]
+        if field.get("view"):
+            # the parent store holds the normalized keys of the children
+            serialize_records = self._mk_nested(field, dict_normalize=False).serialize_records
+            extend_records = Serializer._extend_views
+        else:
+            serialize_records = self._mk_nested(
+                field, dict_normalize=self._dict_normalize).serialize_records
+            extend_records = Serializer._extend_records
+
+        def step(row):
+            return extend_records(serialize_records(row[source]))
+        return step
+
+    def _mk_ignore(self, field):
+        # type: (dict) -> Optional[Callable]
+        """
+        returns a predicate which pushes the ignore value into the store and
+        returns True when the field has to be ignored, None if the field has
+        no ignore definition
+        """
+        if "ignore" not in field:
+            return None
+        name = field["name"]
+        check = self._serializer.get_serializer(_IGNORE_TOKEN, name)
+
+        def ignored(row, store):
+            try:
+                value = check(row)
+            except KeyError:
+                # field will be set to none if it is not found
+                value = None
+            if value == _IGNORE_POISON_PILL:
+                return False
+            store[name] = value
+            return True
+        return ignored
+
+    def _mk_inline_step(self, field):
+        """
+        the step receives the resolved "object" of the field, or the row
+        when the field has none
+        """
+        name = field["name"]
+        transform = self._serializer.get_serializer(_INLINE_TOKEN, name)
+        ignored = self._mk_ignore(field)
+        nested = "object" in field
+        # "case" transforms receive the whole (inner) row
+        source = None if field["transform"]["type"] == "case" else field["from"]
+        get = None if source is None else serializer_typing.path_getter(source)
+
+        if not nested and ignored is None:
+            if source is None:
+                def step(row, store):
+                    store[name] = transform(row)
+            elif "." not in source:
+                def step(row, store):
+                    store[name] = transform(row[source])
+            else:
+                def step(row, store):
+                    store[name] = transform(get(row))
+            return step
+
+        def step(row, store):
+            if nested and row is _NESTED_OBJECT_NOT_FOUND:
+                store[name] = None
+                return
+            if ignored is not None and ignored(row, store):
+                return
+            store[name] = transform(row if get is None else get(row))
+        return step
+
+    def _mk_derived_step(self, field):
+        name = field["name"]
+        transform = self._serializer.get_serializer(_DERIVED_TOKEN, name)
+        ignored = self._mk_ignore(field)
+        source = field.get("from")
+
+        if ignored is None:
+            if source is None:
+                def step(store):
+                    store[name] = transform(store)
+            else:
+                def step(store):
+                    store[name] = transform(store[source])
+            return step
+
+        def step(store):
+            if ignored(store, store):
+                return
+            store[name] = transform(store if source is None else store[source])
+        return step
+
+    def _build_store(self, store):
+        # type: (Optional[dict]) -> dict
+        if self._template is None:
+            return {} if store is None else store
+        _store = self._template.copy()
+        if store:
+            _store.update(store)
+        return _store
+
+    def serialize(self, row, store=None, reuse=False):
+        # type: (dict, Optional[dict], Optional[bool]) -> Any[dict, Generator]
+        """
+        with reuse, the given store is a recycled buffer filled in place
+        """
+        if not reuse:
+            store = self._build_store(store)
+        elif self._template is not None:
+            store.update(self._template)
+        if self._accessors:
+            objects = [row]
+            for parent, accessor in self._accessors:
+                objects.append(accessor(objects[parent]))
+            for index, step in self._inline:
+                step(objects[index], store)
+        else:
+            for _, step in self._inline:
+                step(row, store)
+        extender = None if self._extend is None else self._extend(row)
+        for step in self._derived:
+            step(store)
+        if self._constants:
+            store.update(self._constants)
+        if extender is not None:
+            return extender(store)
+        return store
+
+    def serialize_records(self, records, recycle=False):
+        # type: (Any[List[dict], Tuple[dict], Generator[dict]], Optional[bool]) -> Generator
+        """
+        with recycle, every row is serialized into the same store, which
+        is valid only until the next row is requested
+        """
+        serialize = self.serialize
+        if recycle:
+            if self._extend is not None:
+                raise ValueError("recycle is not supported with extended_array fields")
+            store = self._build_store(None)
+            for row in records:
+                yield serialize(row, store, True)
+        elif self._extend is None:
+            for row in records:
+                yield serialize(row)
+        else:
+            for row in records:
+                for _row in serialize(row):
+                    yield _row
+
+
+class _SourceFilter(object):
+    """
+    Drops the raw records whose key over the `export.unique_on_source`
+    paths was already seen, before they are serialized.
+
+    The paths are raw source paths, dotted paths walk nested objects; a
+    missing path is a None component of the key. Records with an
+    unhashable key are kept, the exporter `unique_on` still applies to
+    the serialized records.
+    """
+
+    def __init__(self, paths, name=None):
+        # type: (List[str], Optional[str]) -> None
+        if isinstance(paths, str):
+            paths = [paths]
+        self.paths = tuple(paths)
+        if not self.paths:
+            raise ValueError("unique_on_source requires at least one path")
+        self.name = name
+        self.records = 0
+        self.skipped = 0
+        self._seen = set()
+        self._getters = tuple(serializer_typing.path_getter(path) for path in self.paths)
+
+    def _key(self, row):
+        # type: (dict) -> Tuple
+        key = []
+        for get in self._getters:
+            try:
+                key.append(get(row))
+            except KeyError:
+                key.append(None)
+        return tuple(key)
+
+    def filter(self, records, report=False):
+        # type: (Any[List[dict], Generator[dict]], Optional[bool]) -> Generator[dict, None, None]
+        """ yields the records not seen yet, `report` prints the counts at the end """
+        seen = self._seen
+        try:
+            for row in records:
+                self.records += 1
+                try:
+                    key = self._key(row)
+                    if key in seen:
+                        self.skipped += 1
+                        continue
+                    seen.add(key)
+                except TypeError:
+                    pass
+                yield row
+        finally:
+            if report:
+                self.report()
+
+    def report(self):
+        print("[SERIALIZER] {}duplicate source records skipped: {} of {}".format(
+            "{}: ".format(self.name) if self.name else "", self.skipped, self.records))
+
+
+class Serializer(object):
+    """
+    Serializes the given records based on the config definition.
+    """
+
+    _NESTED_OBJECT_NOT_FOUND = _NESTED_OBJECT_NOT_FOUND
+
+    def __init__(self, serializer, dict_normalize=False, backend=_PLAN_BACKEND, plan=None, record=None,
+                 config=None):
+        # type: (_SerializerTyping, Optional[bool], Optional[str], Optional[_SerializerPlan], Optional[type], Optional[Dict]) -> None
+        self._serializer = serializer
+        # a serializer loaded from the cache has no _SerializerTyping
+        self.config = config if serializer is None else serializer.config
+        self._dict_normalize = dict_normalize
+        self._backend = backend
+        self._plan = plan
+        self._batch = None
+        # compact record class of the output rows, see record.record_type
+        self._record = record
+        if plan is not None:
+            # already compiled, e.g. loaded from the serializer cache
+            pass
+        elif backend == _PLAN_BACKEND:
+            self._plan = _SerializerPlan(serializer, dict_normalize=dict_normalize)
+        elif backend == _CODEGEN_BACKEND:
+            from adapt.serializer import codegen
+            self._plan = codegen.SerializerCodegen(serializer, dict_normalize=dict_normalize)
+        elif backend != _INTERPRETER_BACKEND:
+            raise ValueError("Invalid serializer backend: {!r}".format(backend))
+
+    @property
+    def source(self):
+        # type: () -> Optional[str]
+        """
+        python source generated for the config, available only with
+        the "codegen" backend
+        """
+        return getattr(self._plan, "source", None)
 
     def _normalized_store(self):
         return dict.fromkeys(self._serializer.get_master_keys())
@@ -136,19 +592,16 @@ class Serializer(object):
     def _get_inner_object(self, row, field):
         if "object" not in field:
             return row
-        for key in field["object"].split("."):
-            if key in row:
-                row = row[key]
-            else:
-                return self._NESTED_OBJECT_NOT_FOUND
-        return row
+        return _mk_object_accessor(field["object"])(row)
 
     def get_config(self, token):
         return self._serializer.config.get(token, [])
 
     @classmethod
     def _handel_array(cls, records, serializer, dict_normalize=False):
-        serializer = cls(serializer=serializer, dict_normalize=dict_normalize)
+        serializer = cls(serializer=serializer,
+                         dict_normalize=dict_normalize,
+                         backend=_INTERPRETER_BACKEND)
         return serializer.serialize_records(records=records)
 
     @staticmethod
@@ -160,6 +613,18 @@ class Serializer(object):
                 yield _record
         return _extend_with
 
+    @staticmethod
+    def _extend_views(records):
+        def _extend_with(record):
+            yield record
+            for _record in records:
+                if isinstance(_record, ExtendedRecord):
+                    # fanned out again by a nested extended_array
+                    yield ExtendedRecord(*(_record.maps + (record, )))
+                else:
+                    yield ExtendedRecord(_record, record)
+        return _extend_with
+
     def _process_inline(self, row, store):
         """
         processes the inline fields i.e., resolves the actual row into
@@ -181,12 +646,16 @@ class Serializer(object):
                 # record, instead of storing as array of the key field in the
                 # store object
                 _serializer = self._get_serializer("extended_array", field)
+                view = field.get("view", False)
                 serialized_rows = self._handel_array(
                     row[field["from"]],
                     serializer=_serializer,
-                    dict_normalize=self._dict_normalize
+                    dict_normalize=self._dict_normalize and not view
                 )
-                extender = self._extend_records(serialized_rows)
+                if view:
+                    extender = self._extend_views(serialized_rows)
+                else:
+                    extender = self._extend_records(serialized_rows)
                 continue
             _row = self._get_inner_object(row, field)
             if _row == self._NESTED_OBJECT_NOT_FOUND:
@@ -207,7 +676,7 @@ class Serializer(object):
             return
         _type = field["transform"]["type"]
         serialize = self._get_serializer(_INLINE_TOKEN, field)
-        value = row if _type in ("case", ) else row[field["from"]]
+        value = row if _type in ("case", ) else serializer_typing.path_getter(field["from"])(row)
         self._push(store, field, serialize(value))
 
     def _process_constants(self, store):
@@ -252,7 +721,7 @@ class Serializer(object):
             pass
 
         # if value is "##$IGNORE_PIL", then do not ignore the field
-        if value == "##$IGNORE_PIL":
+        if value == _IGNORE_POISON_PILL:
             return False
         self._push(store, field, value)
         return True
@@ -271,6 +740,8 @@ class Serializer(object):
         """
         transforms the given raw row into a serialized form
         """
+        if self._plan is not None:
+            return self._plan.serialize(row, store)
         store = self._build_store(store)
         inline_extender = self._process_inline(row, store)
         self._process_derived(store)
@@ -279,8 +750,89 @@ class Serializer(object):
             return inline_extender(store)
         return store
 
-    def serialize_records(self, records):
-        # type: (Any[List[dict], Tuple[dict], Generator[dict]]) -> Generator
+    def serialize_batch(self, rows, as_columns=False):
+        # type: (Any[List[dict], Tuple[dict]], Optional[bool]) -> Any[List[dict], Dict[str, List]]
+        """
+        transforms a chunk of raw rows column-wise, returns the records or,
+        with as_columns, a mapping of field name to column values
+        """
+        from adapt.serializer import batch
+        if self._serializer is None:
+            # loaded from the serializer cache, no config to build columns from:
+            # the row path, the caller filters the source records
+            records = list(self._serialize_records(rows))
+        else:
+            if self._batch is None:
+                self._batch = batch.SerializerBatch(self._serializer, dict_normalize=self._dict_normalize)
+            records = self._batch.serialize_batch(rows)
+        if as_columns:
+            return batch.SerializerBatch.to_columns(records)
+        return records
+
+    def _serialize_batches(self, records, batch_size):
+        # type: (Any[List[dict], Generator[dict]], int) -> Generator
+        chunk = []
+        for row in records:
+            chunk.append(row)
+            if len(chunk) >= batch_size:
+                for record in self.serialize_batch(chunk):
+                    yield record
+                chunk = []
+        if chunk:
+            for record in self.serialize_batch(chunk):
+                yield record
+
+    def output_schema(self, fields=None):
+        # type: (Optional[List[str]]) -> List
+        """
+        the output columns (name, logical type, nullability, precision)
+        derived from the transforms of the config, the export fields
+        first; see schema.output_schema
+        """
+        from adapt.serializer import schema
+        return schema.output_schema(self.config, dict_normalize=self._dict_normalize, fields=fields)
+
+    def source_filter(self):
+        # type: () -> Optional[_SourceFilter]
+        """ a new filter over the `export.unique_on_source` paths, None when not configured """
+        export = self.config.get("export") or {}
+        if not export.get("unique_on_source"):
+            return None
+        return _SourceFilter(export["unique_on_source"], name=export.get("filename"))
+
+    def serialize_records(self, records, batch_size=None, recycle=False, dedupe=None):
+        # type: (Any[List[dict], Tuple[dict], Generator[dict]], Optional[int], Optional[bool], Any[None, bool, _SourceFilter]) -> Generator
+        """
+        with recycle the "plan" and "codegen" backends serialize every row
+        into the same buffer: a yielded row is valid only until the next
+        one is requested, unless the serializer outputs compact records
+
+        duplicate raw records on `export.unique_on_source` are skipped
+        before being serialized and counted at the end; `dedupe` False
+        serializes every record, a `_SourceFilter` is applied as is and
+        shares what it has seen across calls, without reporting
+        """
+        if dedupe is None:
+            source_filter = self.source_filter()
+            if source_filter is not None:
+                records = source_filter.filter(records, report=True)
+        elif dedupe is not False:
+            records = dedupe.filter(records)
+        rows = self._serialize_records(records, batch_size=batch_size, recycle=recycle)
+        if self._record is None:
+            return rows
+        return map(self._record.from_store, rows)
+
+    def _serialize_records(self, records, batch_size=None, recycle=False):
+        # type: (Any[List[dict], Tuple[dict], Generator[dict]], Optional[int], Optional[bool]) -> Generator
+        if batch_size:
+            for row in self._serialize_batches(records, batch_size):
+                yield row
+            return
+        if self._plan is not None:
+            for row in self._plan.serialize_records(records, recycle=recycle):
+                yield row
+            return
         for row in records:
             serialize_row = self.serialize(row)
             if _is_generator(serialize_row):
@@ -290,11 +842,252 @@ class Serializer(object):
                 yield serialize_row
 
     @classmethod
-    def init(cls, config, dict_normalize=False):
-        # type: (Dict, Optional[bool]) -> Serializer
-        return cls(_SerializerTyping(config), dict_normalize=dict_normalize)
+    def _init_cached(cls, config, dict_normalize, cache_dir, record=None):
+        # type: (Dict, bool, str, Optional[type]) -> Serializer
+        from adapt.serializer import cache
+        compiled = cache.SerializerCache(cache_dir).load_or_compile(config, dict_normalize=dict_normalize)
+        return cls(compiled._serializer, dict_normalize=dict_normalize,
+                   backend=_CODEGEN_BACKEND, plan=compiled, record=record, config=config)
+
+    @staticmethod
+    def project(config, fields=True):
+        # type: (Dict, Any[bool, List[str]]) -> Dict
+        """
+        returns the config pruned to the fields needed to output `fields`,
+        True selects the `export.fields` and `export.unique_on` of the
+        config. The fields left out are reported, to clean up the config
+        """
+        if fields is True:
+            export = config.get("export", {})
+            fields = list(export.get("fields", [])) + list(export.get("unique_on", []))
+        projected, unused = _project_config(config, fields)
+        if unused:
+            print("[SERIALIZER] fields not needed by the projection, skipped: {}".format(
+                ", ".join(unused)))
+        return projected
+
+    @classmethod
+    def init(cls, config, dict_normalize=False, backend=_PLAN_BACKEND, cache_dir=None, compact=False,
+             project=None, profile=None):
+        # type: (Dict, Optional[bool], Optional[str], Optional[str], Optional[bool], Any[bool, List[str]], Any[bool, str]) -> Serializer
+        """
+        backend "plan" (default) compiles the config into a flat per-row
+        execution plan, "codegen" generates a specialized python function
+        for the config and "interpreter" walks the config for every row
+
+        cache_dir (or ADAPT_SERIALIZER_CACHE_DIR) persists the generated
+        code of the "codegen" backend across runs
+
+        compact outputs tuple backed records, in the order of the
+        `export.fields`, instead of dicts
+
+        project skips the fields which are not needed to output the given
+        fields (True: the export fields), see `project`
+
+        profile builds an instrumented plan counting calls, time, ignore
+        hits and errors per field, reported at the end of
+        `serialize_records` (a path also writes the report as JSON)
+        """
+        if project:
+            config = cls.project(config, project)
+        record = None
+        if compact:
+            from adapt.serializer import record as _record
+            record = _record.record_type(_record_fields(config, dict_normalize))
+        if profile:
+            from adapt.serializer import profiler
+            serializer = _SerializerTyping(config)
+            plan = profiler.SerializerProfile(serializer, dict_normalize=dict_normalize,
+                                              report_path=None if profile is True else profile)
+            return cls(serializer, dict_normalize=dict_normalize, backend=_PLAN_BACKEND,
+                       plan=plan, record=record)
+        if backend == _CODEGEN_BACKEND:
+            from adapt.serializer import cache
+            cache_dir = cache_dir or cache.ADAPT_SERIALIZER_CACHE_DIR
+            if cache_dir:
+                return cls._init_cached(config, dict_normalize, cache_dir, record=record)
+        elif cache_dir:
+            raise ValueError("serializer cache requires the {!r} backend".format(_CODEGEN_BACKEND))
+        return cls(_SerializerTyping(config), dict_normalize=dict_normalize, backend=backend, record=record)
 
     @classmethod
-    def lazy_run(cls, config, records, dict_normalize=False):
-        # type: (Dict, Any[List[dict], Generator], Optional[bool]) -> Generator
-        return cls.init(config, dict_normalize=dict_normalize).serialize_records(records)
+    def lazy_run(cls, config, records, dict_normalize=False, backend=_PLAN_BACKEND, cache_dir=None,
+                 batch_size=None, workers=None, chunk_size=None, ordered=True, compact=False,
+                 recycle=False, project=None, profile=None):
+        # type: (Dict, Any[List[dict], Generator], Optional[bool], Optional[str], Optional[str], Optional[int], Optional[int], Optional[int], Optional[bool], Optional[bool], Optional[bool], Any[bool, List[str]], Any[bool, str]) -> Generator
+        """
+        with workers > 1 the records are serialized on a process pool,
+        see parallel_run; recycle and profile are not supported there
+        """
+        if workers is not None and int(workers) > 1:
+            if recycle:
+                # the records are pickled back from the workers, a reused store would be shared
+                raise ValueError("recycle is not supported with workers > 1")
+            if profile:
+                raise ValueError("profile is not supported with workers > 1, profile a single process run")
+            return cls.parallel_run(config, records, workers=workers, chunk_size=chunk_size,
+                                    ordered=ordered, dict_normalize=dict_normalize, backend=backend,
+                                    cache_dir=cache_dir, batch_size=batch_size, compact=compact,
+                                    project=project)
+        return cls.init(config, dict_normalize=dict_normalize, backend=backend, cache_dir=cache_dir,
+                        compact=compact, project=project, profile=profile).serialize_records(
+            records, batch_size=batch_size, recycle=recycle)
+
+    @classmethod
+    def parallel_run(cls, config, records, workers=None, chunk_size=None, ordered=True,
+                     max_in_flight=None, dict_normalize=False, backend=_PLAN_BACKEND,
+                     cache_dir=None, batch_size=None, compact=False, project=None):
+        # type: (Dict, Any[List[dict], Generator], Optional[int], Optional[int], Optional[bool], Optional[int], Optional[bool], Optional[str], Optional[str], Optional[int], Optional[bool], Any[bool, List[str]]) -> Generator
+        """
+        serializes chunks of `chunk_size` records on a pool of `workers`
+        processes (default: cpu count), each holding a serializer built
+        from the config. At most `max_in_flight` chunks (default: twice
+        the workers) are pending at a time. With `ordered` (default) the
+        records are yielded in the input order.
+        """
+        from adapt.serializer import parallel
+        if project:
+            # projected once, the workers receive the pruned config
+            config = cls.project(config, project)
+        # fails fast on an invalid config, and warms the serializer cache
+        serializer = cls.init(config, dict_normalize=dict_normalize, backend=backend,
+                              cache_dir=cache_dir, compact=compact)
+        # duplicates are dropped before the records are shipped to the workers
+        source_filter = serializer.source_filter()
+        if source_filter is not None:
+            records = source_filter.filter(records, report=True)
+        return parallel.ParallelSerializer(
+            config, workers=workers, chunk_size=chunk_size or _PARALLEL_CHUNK_SIZE, ordered=ordered,
+            max_in_flight=max_in_flight, dict_normalize=dict_normalize, backend=backend,
+            cache_dir=cache_dir, batch_size=batch_size, compact=compact
+        ).serialize_records(records)
+
+    @classmethod
+    def multi_run(cls, configs, records, exporter=None, dict_normalize=False, backend=_PLAN_BACKEND,
+                  cache_dir=None, batch_size=None, chunk_size=None, compact=False, project=None):
+        # type: (Any[Dict[str, Dict], List[Dict]], Any[List[dict], Generator], Optional[Callable], Optional[bool], Optional[str], Optional[str], Optional[int], Optional[int], Optional[bool], Any[bool, List[str]]) -> Dict[str, Any]
+        """
+        serializes the records with several configs in a single pass and
+        exports the outputs of each config with `exporter(config, records)`
+        (default: CSVExporter.lazy_run), returns the exporter results by
+        tag, see multi.MultiSerializer
+        """
+        from adapt.serializer import multi
+        return multi.MultiSerializer.init(
+            configs, dict_normalize=dict_normalize, backend=backend, cache_dir=cache_dir,
+            compact=compact, project=project, chunk_size=chunk_size or _PARALLEL_CHUNK_SIZE,
+            batch_size=batch_size
+        ).export(records, exporter=exporter)
+
+
+# keys of a derived field definition naming the fields of the store it reads
+_REFERENCE_KEYS = ("from", "field", "numerator", "denominator")
+
+# derived transforms reading the store through the referenced fields only
+_RECORD_TRANSFORMS = ("case", "ratio", "expression", "lookup")
+
+
+def _references(definition):
+    # type: (Any) -> set
+    """ names of the store fields referenced anywhere in a field definition """
+    references = set()
+    if isinstance(definition, dict):
+        for key, value in definition.items():
+            if key in _REFERENCE_KEYS and isinstance(value, str):
+                references.add(value)
+            elif key == "expr" and isinstance(value, str):
+                references.update(serializer_typing.parse_expression(value))
+            elif key == "type" and value == "lookup":
+                references.update(serializer_typing.TypeLookup.record_fields(definition) or ())
+            else:
+                references.update(_references(value))
+    elif isinstance(definition, list):
+        for value in definition:
+            references.update(_references(value))
+    return references
+
+
+def _needed_fields(config, fields):
+    # type: (Dict, set) -> Optional[set]
+    """
+    the fields needed to output `fields`: the fields themselves and every
+    field the needed derived fields read, transitively. None when a needed
+    derived field may read any field of the store
+    """
+    derived = dict((field["name"], field) for field in config.get(_DERIVED_TOKEN, []))
+    needed = set()
+    pending = list(fields)
+    while pending:
+        name = pending.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        field = derived.get(name)
+        if field is None:
+            continue
+        if "from" not in field and field["transform"]["type"] not in _RECORD_TRANSFORMS:
+            # the transform receives the whole store
+            return None
+        pending.extend(_references(field))
+    return needed
+
+
+def _project_config(config, fields):
+    # type: (Dict, List[str]) -> Tuple[Dict, List[str]]
+    """
+    returns a copy of the config without the fields which are not needed
+    to output `fields`, and the names of the fields left out
+    """
+    needed = _needed_fields(config, set(fields))
+    if needed is None:
+        return config, []
+    projected = dict(config)
+    unused = []
+    for token in (_INLINE_TOKEN, _DERIVED_TOKEN, _CONSTANTS_TOKEN):
+        if token not in config:
+            continue
+        kept = []
+        for field in config[token]:
+            if field.get("type") == "extended_array":
+                # fanned out records carry the fields of the nested config
+                nested, _unused = _project_config(field, fields)
+                kept.append(nested)
+                unused.extend(_unused)
+            elif field["name"] in needed:
+                kept.append(field)
+            else:
+                unused.append(field["name"])
+        projected[token] = kept
+    return projected, unused
+
+
+def _record_fields(config, dict_normalize=False):
+    # type: (Dict, bool) -> List[str]
+    """
+    fields of the compact record of a config: the export fields first,
+    then the other output fields in the config order
+    """
+    def names(_config, nested):
+        for token in (_INLINE_TOKEN, _DERIVED_TOKEN, _CONSTANTS_TOKEN):
+            for field in _config.get(token, []):
+                _type = field.get("type")
+                if _type == "extended_array":
+                    raise ValueError("compact records do not support extended_array "
+                                     "field {!r}".format(field["name"]))
+                if _type == "array":
+                    if not nested:
+                        yield field["name"]
+                    if dict_normalize:
+                        # normalized stores hold the keys of nested arrays
+                        for name in names(field, True):
+                            yield name
+                    continue
+                yield field["name"]
+
+    fields = list(config.get("export", {}).get("fields", []))
+    seen = set(fields)
+    for name in names(config, False):
+        if name not in seen:
+            seen.add(name)
+            fields.append(name)
+    return fields
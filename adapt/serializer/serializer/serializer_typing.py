@@ -15,7 +15,15 @@
 # * limitations under the License.
 # **************************************************************************/
 
-from typing import Any, List, Dict
+from typing import Any, Callable, List, Dict, Optional, Tuple
+from datetime import date as _date, datetime
+from functools import lru_cache
+import ast
+import json
+import operator
+import os
+import re
+import sys
 
 
 __all__ = [
@@ -29,16 +37,91 @@ __all__ = [
     "TypeConstant",
     "TypeIgnore",
     "TypeRatio",
+    "TypeExpression",
+    "TypeLookup",
     "init_type",
+    "register_type",
 ]
 
+# entry point group of the transforms shipped by other packages
+_ENTRY_POINT_GROUP = "adapt.serializer.transforms"
+
+# transforms registered by name, besides the built-in Type* classes
+_REGISTRY = {}
+
+# entry points of _ENTRY_POINT_GROUP by name, read on the first unknown type
+_ENTRY_POINTS = None
+
 
 def class_name(string, prefix="Type"):
     return prefix + ''.join(x.capitalize() or '_' for x in string.split('_'))
 
 
+def _builtin_type(name):
+    # type: (str) -> Optional[type]
+    transform = globals().get(class_name(name))
+    return transform if isinstance(transform, type) else None
+
+
+def register_type(name, transform=None):
+    # type: (str, Optional[Callable]) -> Callable
+    """
+    registers a custom transform under `name`, usable as a decorator.
+
+    The transform is built like the built-in ones, with the parameters of
+    the config prefixed by an underscore, and called with one value per
+    row. An optional `call_batch(values)` method transforming a list of
+    values is used by the batch mode, with the per row call as fallback.
+    Built-in transforms cannot be replaced.
+    """
+    def register(_transform):
+        if not callable(_transform):
+            raise TypeError("Transform {!r} is not callable".format(_transform))
+        if _builtin_type(name) is not None:
+            raise ValueError("Transform type {!r} is built-in".format(name))
+        if _REGISTRY.get(name, _transform) is not _transform:
+            raise ValueError("Transform type {!r} is already registered: {!r}".format(name, _REGISTRY[name]))
+        _REGISTRY[name] = _transform
+        return _transform
+    if transform is None:
+        return register
+    return register(transform)
+
+
+def _entry_points():
+    # type: () -> Dict[str, Any]
+    global _ENTRY_POINTS
+    if _ENTRY_POINTS is None:
+        try:
+            from importlib import metadata
+        except ImportError:
+            # python 3.7, entry points need the importlib_metadata backport
+            try:
+                import importlib_metadata as metadata
+            except ImportError:
+                metadata = None
+        entry_points = [] if metadata is None else metadata.entry_points()
+        if hasattr(entry_points, "select"):
+            entry_points = entry_points.select(group=_ENTRY_POINT_GROUP)
+        elif isinstance(entry_points, dict):
+            entry_points = entry_points.get(_ENTRY_POINT_GROUP, [])
+        _ENTRY_POINTS = dict((entry_point.name, entry_point) for entry_point in entry_points)
+    return _ENTRY_POINTS
+
+
 def get_type(name):
-    return globals()[class_name(name)]
+    """
+    returns the transform class of `name`: a built-in Type* class, a
+    registered transform or one of the `adapt.serializer.transforms` entry
+    points, imported on first use
+    """
+    transform = _builtin_type(name) or _REGISTRY.get(name)
+    if transform is not None:
+        return transform
+    entry_point = _entry_points().get(name)
+    if entry_point is None:
+        raise KeyError("Unknown transform type {!r}".format(name))
+    return register_type(name, entry_point.load())
 
 
 def args(params):
@@ -50,43 +133,197 @@ def init_type(name, params):
     return get_type(name)(**args(params))
 
 
+def _numpy():
+    # numpy is optional, batch transforms fall back to pure python
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _numeric_array(values):
+    """ returns `values` as a numpy array if they are all numbers, else None """
+    np = _numpy()
+    if np is None or not values:
+        return None
+    try:
+        array = np.asarray(values)
+    except (ValueError, TypeError):
+        return None
+    return array if array.dtype.kind in "iuf" else None
+
+
 # ------------------------------------------------------------------
 #                           TYPE DEFINITIONS
 # ------------------------------------------------------------------
 
-class TypeDate(object):
+_DATE_CACHE_SIZE = 1024
+
+# distinct strings interned per `dictionary` field, the others are kept as is
+_INTERN_POOL_SIZE = 65536
+
+# ISO-8601 date with optional time and offset, only the date part is used
+_ISO_DATE = re.compile(
+    r"^(\d{4})-(\d{2})-(\d{2})"
+    r"(?:[T ](?:[01]\d|2[0-3]):[0-5]\d(?::[0-5]\d(?:\.\d{1,6})?)?"
+    r"(?:Z|[+-](?:[01]\d|2[0-3])(?::?[0-5]\d)?)?)?$"
+)
+
+
+class _CachedTransform(object):
+    """
+    memoizes `_convert` with a bounded LRU cache per transform instance,
+    for low cardinality values such as dates
+    """
+
+    def _init_cache(self, cache_size):
+        # type: (Optional[int]) -> None
+        self.cache_size = cache_size
+        if cache_size:
+            self._cached = lru_cache(maxsize=cache_size)(self._convert)
+        else:
+            self._cached = self._convert
+
+    def __call__(self, value):
+        return self._cached(value)
+
+    def cache_info(self):
+        # type: () -> Dict
+        """ returns the cache hit / miss counters of the transform """
+        if not self.cache_size:
+            return {"hits": 0, "misses": 0, "hit_ratio": 0.0, "size": 0}
+        info = self._cached.cache_info()
+        total = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_ratio": float(info.hits) / total if total else 0.0,
+            "size": info.currsize,
+        }
+
+
+class InternedTransform(object):
+    """
+    wraps the transform of a `dictionary` field, equal output strings are
+    returned as one shared object, so that buffered records hold a single
+    copy of each distinct value of a low cardinality field
+    """
+
+    def __init__(self, transform, pool_size=_INTERN_POOL_SIZE):
+        # type: (Callable, int) -> None
+        self.transform = transform
+        self.pool_size = pool_size
+        self.pool = {}
+        self.has_record_access = getattr(transform, "has_record_access", False)
+
+    def __reduce__(self):
+        return self.__class__, (self.transform, self.pool_size)
+
+    def intern(self, value):
+        # type: (Any) -> Any
+        if type(value) is not str:
+            return value
+        pool = self.pool
+        if len(pool) < self.pool_size:
+            return pool.setdefault(value, value)
+        return pool.get(value, value)
+
+    def __call__(self, value):
+        return self.intern(self.transform(value))
+
+    def call_batch(self, values):
+        # type: (List) -> List
+        call_batch = getattr(self.transform, "call_batch", None)
+        values = list(map(self.transform, values)) if call_batch is None else call_batch(values)
+        return list(map(self.intern, values))
+
+
+class TypeDate(_CachedTransform):
     """ converting date from one format to another"""
 
-    def __init__(self, _format):
+    def __init__(self, _format, _cache_size=_DATE_CACHE_SIZE):
+        self._format = _format
         self.input = _format["input"]
         self.output = _format["output"]
+        self._init_cache(_cache_size)
 
-    def __call__(self, value):
-        from datetime import datetime
+    def __reduce__(self):
+        # the lru cache is not picklable, rebuild from the definition
+        return self.__class__, (self._format, self.cache_size)
+
+    def _convert(self, value):
         return datetime.strptime(value, self.input).strftime(self.output)
 
 
-class TypeDateParser(object):
-    """ converting date from one format to another"""
+class TypeDateParser(_CachedTransform):
+    """ converting date from one format to another
 
-    def __init__(self, _format):
-        self.output = _format["output"]
+    ISO-8601 values, and values matching the optional `input` format, are
+    parsed without dateutil, which handles everything else.
+    """
 
-    def __call__(self, value):
+    def __init__(self, _format, _cache_size=_DATE_CACHE_SIZE):
+        self._format = _format
+        self.input = _format.get("input")
+        self.output = _format["output"]
+        # number of values parsed by each path, cache hits excluded
+        self.parsed = {"iso": 0, "input": 0, "dateutil": 0}
+        self._init_cache(_cache_size)
+
+    def __reduce__(self):
+        # the lru cache is not picklable, rebuild from the definition
+        return self.__class__, (self._format, self.cache_size)
+
+    def _parse(self, value):
+        if isinstance(value, str):
+            match = _ISO_DATE.match(value)
+            if match:
+                try:
+                    date = _date(*map(int, match.groups()))
+                    self.parsed["iso"] += 1
+                    return date
+                except ValueError:
+                    pass
+            if self.input is not None:
+                try:
+                    date = datetime.strptime(value, self.input).date()
+                    self.parsed["input"] += 1
+                    return date
+                except ValueError:
+                    pass
         from dateutil import parser
         date = parser.parse(value).date()
-        return date.strftime(self.output)
+        self.parsed["dateutil"] += 1
+        return date
+
+    def _convert(self, value):
+        return self._parse(value).strftime(self.output)
+
+    def cache_info(self):
+        # type: () -> Dict
+        info = super(TypeDateParser, self).cache_info()
+        info["parsed"] = dict(self.parsed)
+        return info
 
 
 class TypeFloat(object):
-    """ converting float from one format to another"""
+    """ converting float from one format to another, rounded to `precision` when given """
 
-    def __init__(self, _precision):
+    def __init__(self, _precision=None):
         self.precision = _precision
 
     def __call__(self, value):
+        if self.precision is None:
+            return float(str(value))
         return round(float(str(value)), self.precision)
 
+    def call_batch(self, values):
+        precision = self.precision
+        if precision is None:
+            return [float(str(value)) for value in values]
+        return [round(float(str(value)), precision) for value in values]
+
 
 class TypeInteger(object):
     """ converting into integer """
@@ -96,6 +333,9 @@ class TypeInteger(object):
     def __call__(self, value):
         return int(value)
 
+    def call_batch(self, values):
+        return list(map(int, values))
+
 
 class TypeBool(object):
     """ converting into boolean """
@@ -114,6 +354,9 @@ class TypeString(object):
     def __call__(self, value):
         return str(value)
 
+    def call_batch(self, values):
+        return list(map(str, values))
+
 
 class TypeEnum(object):
     """ mapping a value to another value """
@@ -140,90 +383,192 @@ class TypeCurrency(object):
     def __call__(self, value):
         return round(float(value) * self.multiplier, self.rounding)
 
+    def call_batch(self, values):
+        rounding = self.rounding
+        array = _numeric_array(values)
+        if array is not None:
+            # the product is computed vectorized, rounding stays python's
+            # so results are identical to the scalar path
+            values = (array.astype("float64") * self.multiplier).tolist()
+            return [round(value, rounding) for value in values]
+        multiplier = self.multiplier
+        return [round(float(value) * multiplier, rounding) for value in values]
+
+
+_PREDICATE_OPS = ("greater_than", "less_than", "equal", "not_equal",
+                  "in", "not_in", "null", "not_null")
+
+
+def predicate_op(when):
+    # type: (Dict) -> str
+    op = (set(when.keys()) - {"field"}) & set(_PREDICATE_OPS)
+    if len(op) != 1:
+        raise ValueError(f"Invalid ignore operator: {op}")
+    return list(op)[0]
+
+
+def predicate_members(operand):
+    # type: (Any) -> Optional[frozenset]
+    """
+    returns the `in` / `not_in` list as a frozenset, or None when it holds
+    unhashable members
+    """
+    if not isinstance(operand, (list, tuple)):
+        return None
+    try:
+        return frozenset(operand)
+    except TypeError:
+        return None
+
+
+def compile_predicate(when):
+    # type: (Dict) -> Callable[[Any], Any]
+    """
+    compiles the condition of a `when` clause into a single callable,
+    returns a truthy value when the condition holds
+    """
+    op = predicate_op(when)
+    operand = when.get(op)
+    if op == "greater_than":
+        return lambda value: value and value > operand
+    if op == "less_than":
+        return lambda value: value and value < operand
+    if op == "null" or (op == "equal" and operand is None):
+        return lambda value: value is None
+    if op == "not_null" or (op == "not_equal" and operand is None):
+        return lambda value: value is not None
+    if op == "equal":
+        return lambda value: value == operand
+    if op == "not_equal":
+        return lambda value: value != operand
+    members = predicate_members(operand)
+    if members is None:
+        if op == "in":
+            return lambda value: value in operand
+        return lambda value: value not in operand
+    if op == "in":
+        def contains(value):
+            try:
+                return value in members
+            except TypeError:
+                # unhashable value, never in a list of hashable members
+                return False
+        return contains
+
+    def not_contains(value):
+        try:
+            return value not in members
+        except TypeError:
+            return True
+    return not_contains
+
+
+class SharedPredicate(object):
+    """
+    a predicate occurring in several case / ignore conditions of a config;
+    predicates are pure functions of the field value, so the result of the
+    last evaluation is reused while consumers read the same value of a row
+    """
+
+    __slots__ = ("predicate", "_last")
+
+    def __init__(self, predicate):
+        # type: (Callable[[Any], Any]) -> None
+        self.predicate = predicate
+        # (value, result), swapped as one reference to stay thread safe
+        self._last = (SharedPredicate, None)
+
+    def __call__(self, value):
+        # type: (Any) -> Any
+        last = self._last
+        if last[0] is value:
+            return last[1]
+        result = self.predicate(value)
+        self._last = (value, result)
+        return result
+
 
-class _TypeCaseProxy(object):
+class PredicatePool(object):
+    """
+    interns the `when` conditions of a config, conditions occurring more
+    than once are compiled into one SharedPredicate for all the consumers
+    """
 
-    symbols = {
-        "greater_than": lambda self, value: value and value > self.when,
-        "less_than": lambda self, value: value and value < self.when,
-        "equal": lambda self, value: value == self.when,
-        "not_equal": lambda self, value: value != self.when,
-        "in": lambda self, value: value in self.when,
-        "not_in": lambda self, value: value not in self.when,
-        "null": lambda _, value: value is None,
-        "not_null": lambda _, value: value is not None,
-    }
+    def __init__(self, whens=()):
+        # type: (Any) -> None
+        self._counts = {}
+        self._shared = {}
+        for when in whens:
+            key = self.key(when)
+            self._counts[key] = self._counts.get(key, 0) + 1
 
-    @classmethod
-    def _derive_op_name(cls, when):
+    @staticmethod
+    def key(when):
         # type: (Dict) -> str
-        op = (set(when.keys()) - {"field"}) & set(cls.symbols.keys())
-        if len(op) != 1:
-            raise ValueError(f"Invalid ignore operator: {op}")
-        return list(op)[0]
-
-    @classmethod
-    def create(cls, when, then, poison_pill):
-        def method(symbol):
-            def __call__(self, value):
-                if symbol(self, value[self.field]):
-                    if isinstance(self.then._then, dict) and \
-                            "field" in self.then._then:
-                        return self.then(value)
-                    else:
-                        return self.then(value[self.field])
-                else:
-                    return self._poison_pill
-            return __call__
-
-        def init():
-            def __init__(self, _when, _then, _field=None, _poison_pill=poison_pill):
-                self.when = _when
-                self.then = _then
-                self.field = _field
-                self._poison_pill = _poison_pill
-            return __init__
-
-        op_name = cls._derive_op_name(when)
-        new_cls = type(class_name(op_name), (object,), {})
-        setattr(new_cls, "__call__", method(cls.symbols[op_name]))
-        setattr(new_cls, "__init__", init())
-        obj = new_cls(when[op_name], then, when["field"], poison_pill)
-        return obj
-
-
-class _TypeThen(object):
-
-        def __init__(self, _then):
-            # type: (Dict) -> None
-            self._then = _then
-            if isinstance(_then, dict):
-                from copy import deepcopy
-                then = deepcopy(_then)
-                then.pop("field", None)
-                self.then = init_type(_then['type'], params=then)
-            else:
-                self.then = lambda _: _then
+        return json.dumps(when, sort_keys=True, default=repr)
 
-        def __call__(self, value):
-            # type: (Any) -> Any
-            if isinstance(self._then, dict) and "field" in self._then:
-                value = value[self._then["field"]]
-            return self.then(value)
+    def get(self, when):
+        # type: (Dict) -> Callable[[Any], Any]
+        key = self.key(when)
+        if self._counts.get(key, 0) < 2:
+            return compile_predicate(when)
+        if key not in self._shared:
+            self._shared[key] = SharedPredicate(compile_predicate(when))
+        return self._shared[key]
 
 
-class _TypeCase(object):
+@lru_cache(maxsize=None)
+def path_getter(path):
+    # type: (str) -> Callable[[Dict], Any]
+    """
+    returns a getter of the field `path` of a record; a dotted path is split
+    once and walked through the nested objects, a literal key holding the
+    dots is looked up when the walk fails. A missing key or a non object at
+    any level raises KeyError, like a missing plain field
+    """
+    if "." not in path:
+        return operator.itemgetter(path)
+    keys = tuple(path.split("."))
 
-        def __init__(self, _when, _then):
-            # type: (Dict, Any) -> None
-            self.when = _when
-            self.case = _TypeCaseProxy.create(_when, _TypeThen(_then), "##CASE_PIL")
+    def getter(record):
+        value = record
+        try:
+            for key in keys:
+                if key not in value:
+                    break
+                value = value[key]
+            else:
+                return value
+        except TypeError:
+            pass
+        try:
+            found = path in record
+        except TypeError:
+            found = False
+        if found:
+            return record[path]
+        raise KeyError(path)
+    return getter
 
-        def __call__(self, value):
-            # type: (Dict) -> Any
-            if self.when["field"] not in value:
-                return "##CASE_PIL"
-            return self.case(value)
+
+def _compile_then(then, when_field):
+    # type: (Any, str) -> Callable[[Dict], Any]
+    """
+    compiles the `then` of a case into a callable on the record; the
+    transform reads `then.field`, the `when` field or the whole record
+    for transforms like "ratio"
+    """
+    if not isinstance(then, dict):
+        return lambda record: then
+    params = dict(then)
+    source = params.pop("field", None)
+    transform = init_type(params["type"], params)
+    if source is None and getattr(transform, "has_record_access", False):
+        return transform
+    if source is None:
+        source = when_field
+    get = path_getter(source)
+    return lambda record: transform(get(record))
 
 
 class TypeCase(object):
@@ -243,17 +588,27 @@ class TypeCase(object):
                 then: lifetime
     """
 
-    def __init__(self, _cases, _default=None):
-        # type: (List[Dict], Any) -> None
-        self.cases = [_TypeCase(**args(case)) for case in _cases]
+    def __init__(self, _cases, _default=None, _predicates=None):
+        # type: (List[Dict], Any, Optional[PredicatePool]) -> None
+        self._cases = _cases
         self.default = _default
+        predicate = compile_predicate if _predicates is None else _predicates.get
+        self._branches = tuple(
+            (case["when"]["field"], predicate(case["when"]),
+             _compile_then(case.get("then"), case["when"]["field"]))
+            for case in _cases
+        )
+
+    def __reduce__(self):
+        # compiled predicates are closures, rebuild from the definition,
+        # the copy evaluates its conditions unshared
+        return self.__class__, (self._cases, self.default)
 
     def __call__(self, value):
         # type: (dict) -> Any
-        for case in self.cases:
-            output = case(value)
-            if output != "##CASE_PIL":
-                return output
+        for field, predicate, then in self._branches:
+            if field in value and predicate(value[field]):
+                return then(value)
         return self.default
 
 
@@ -270,14 +625,25 @@ class TypeIgnore(object):
             then: null
     """
 
-    def __init__(self, _when, _then):
-        # type: (Dict, Any) -> None
+    def __init__(self, _when, _then, _predicates=None):
+        # type: (Dict, Any, Optional[PredicatePool]) -> None
+        self._when = _when
+        self._then = _then
         self.field = _when["field"]
-        self.case = _TypeCaseProxy.create(_when, _TypeThen(_then), "##$IGNORE_PIL")
+        self.get = path_getter(self.field)
+        self.predicate = compile_predicate(_when) if _predicates is None else _predicates.get(_when)
+        self.then = _compile_then(_then, self.field)
+
+    def __reduce__(self):
+        # compiled predicates are closures, rebuild from the definition,
+        # the copy evaluates its condition unshared
+        return self.__class__, (self._when, self._then)
 
     def __call__(self, value):
         # type: (Any) -> Any
-        return self.case(value)
+        if self.predicate(self.get(value)):
+            return self.then(value)
+        return "##$IGNORE_PIL"
 
 
 class TypeConstant(object):
@@ -303,6 +669,7 @@ class TypeConstant(object):
 class TypeRatio(object):
     """
     Calculates ratio between two fields with safe division.
+    Applied on the whole record, also when used as the `then` of a case.
     
     Example:
         derived:
@@ -315,6 +682,8 @@ class TypeRatio(object):
               default: 0.0
     """
     
+    has_record_access = True
+
     def __init__(self, _numerator, _denominator, _precision=2, _default=0.0, **kwargs):
         # type: (str, str, int, float, Dict) -> None
         self.numerator = _numerator
@@ -345,6 +714,342 @@ class TypeRatio(object):
         except (ValueError, TypeError):
             return self.default
 
+    def call_batch(self, stores):
+        # type: (List[dict]) -> List[float]
+        """
+        Calculate ratios of a batch of records, vectorized when the
+        numerator and denominator values are all numbers
+        """
+        numerators = _numeric_array([store.get(self.numerator, 0) for store in stores])
+        denominators = _numeric_array([store.get(self.denominator, 0) for store in stores])
+        if numerators is None or denominators is None:
+            return [self(store) for store in stores]
+        np = _numpy()
+        numerators = numerators.astype("float64")
+        denominators = denominators.astype("float64")
+        positive = denominators > 0
+        ratios = np.divide(numerators, denominators,
+                           out=np.zeros_like(numerators), where=positive).tolist()
+        precision, default = self.precision, self.default
+        return [round(ratio, precision) if ok else default
+                for ratio, ok in zip(ratios, positive.tolist())]
+
+
+
+# functions callable from an `expression` transform
+_EXPRESSION_FUNCTIONS = {
+    "abs": abs,
+    "min": min,
+    "max": max,
+    "round": round,
+    "float": float,
+    "int": int,
+}
+
+# literals are parsed into `Constant` from python 3.8 on
+_EXPRESSION_CONSTANTS = (ast.Constant, ) if sys.version_info >= (3, 8) else (ast.Num, ast.Str, ast.NameConstant)
+
+# syntax allowed in an `expression` transform, anything else is rejected
+_EXPRESSION_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Call, ast.Name, ast.Load, ast.Tuple,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.UAdd, ast.USub, ast.Not, ast.And, ast.Or,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Is, ast.IsNot, ast.In, ast.NotIn,
+) + _EXPRESSION_CONSTANTS
+
+_EXPRESSION_RECORD = "_record"
+
+
+def parse_expression(expr):
+    # type: (str) -> List[str]
+    """
+    parses an `expression` transform and checks it against the allowed
+    syntax, returns the names of the fields it reads in order
+    """
+    try:
+        tree = ast.parse(expr.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError("Invalid expression {!r}: {}".format(expr, e.msg))
+    functions = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, _EXPRESSION_NODES):
+            raise ValueError("Unsupported syntax {!r} in expression {!r}".format(type(node).__name__, expr))
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in _EXPRESSION_FUNCTIONS \
+                    or node.keywords:
+                raise ValueError("Unsupported call in expression {!r}, allowed functions: {}".format(
+                    expr, ", ".join(sorted(_EXPRESSION_FUNCTIONS))))
+            functions.add(node.func)
+        elif isinstance(node, _EXPRESSION_CONSTANTS) and \
+                not isinstance(getattr(node, "value", None), (int, float, str, type(None))):
+            raise ValueError("Unsupported literal in expression {!r}".format(expr))
+    fields = []
+    names = [node for node in ast.walk(tree) if isinstance(node, ast.Name) and node not in functions]
+    for node in sorted(names, key=lambda _node: (_node.lineno, _node.col_offset)):
+        if node.id not in fields:
+            fields.append(node.id)
+    if _EXPRESSION_RECORD in fields:
+        raise ValueError("Reserved field name {!r} in expression {!r}".format(_EXPRESSION_RECORD, expr))
+    return fields
+
+
+def compile_expression(expr):
+    # type: (str) -> Callable[[Dict], Any]
+    """
+    compiles a validated `expression` into a function of the record, the
+    fields are read once into locals ahead of the expression
+    """
+    lines = ["def expression(%s):" % _EXPRESSION_RECORD]
+    for field in parse_expression(expr):
+        lines.append("    %s = %s[%r]" % (field, _EXPRESSION_RECORD, field))
+    lines.append("    return (%s)" % expr.strip())
+    namespace = dict(_EXPRESSION_FUNCTIONS, __builtins__={})
+    exec(compile("\n".join(lines) + "\n", "<expression>", "exec"), namespace)
+    return namespace["expression"]
+
+
+class TypeExpression(object):
+    """
+    Arithmetic expression on the fields of the record, parsed once and
+    compiled into a python function. Supports `+ - * / // %`, comparisons,
+    `and` / `or` / `not`, `a if condition else b` and the functions abs,
+    min, max, round, float and int. A missing field, a division by zero or
+    a null operand results in `default`.
+
+    Example:
+        derived:
+          - name: ctr
+            transform:
+              type: expression
+              expr: "clicks / impressions if impressions > 0 else 0.0"
+              precision: 6
+              default: 0.0
+    """
+
+    has_record_access = True
+
+    def __init__(self, _expr, _precision=None, _default=None, **kwargs):
+        # type: (str, Optional[int], Any, Dict) -> None
+        self.expr = _expr
+        self.precision = _precision
+        self.default = _default
+        self.fields = parse_expression(_expr)
+        self.function = compile_expression(_expr)
+
+    def __reduce__(self):
+        # the compiled function is not picklable, rebuilt from the definition
+        return self.__class__, (self.expr, self.precision, self.default)
+
+    def __call__(self, record):
+        # type: (dict) -> Any
+        try:
+            value = self.function(record)
+            if self.precision is not None:
+                value = round(value, self.precision)
+        except (ArithmeticError, KeyError, TypeError, ValueError):
+            return self.default
+        return value
+
+
+# reference tables of the lookup transforms, shared by the serializers of a process
+_LOOKUP_TABLES = {}
+
+_LOOKUP_CACHE_SIZE = 65536
+
+_SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+_SQLITE_MMAP_SIZE = 2 ** 28
+
+_LOOKUP_MISSING = object()
+
+
+def _lookup_key(value):
+    # keys are compared as strings, CSV cells have no type
+    return None if value is None else str(value)
+
+
+def _quote_identifier(name):
+    # type: (str) -> str
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+class _CsvTable(object):
+    """ reference table of a CSV file, loaded once into a hash index """
+
+    def __init__(self, path, key, value):
+        # type: (str, Tuple[str, ...], str) -> None
+        import csv
+        index = {}
+        with open(path, newline="") as _file:
+            reader = csv.reader(_file)
+            header = next(reader, [])
+            missing = [column for column in key + (value, ) if column not in header]
+            if missing:
+                raise ValueError("Columns {!r} not found in lookup table {!r}".format(missing, path))
+            positions = [header.index(column) for column in key]
+            position = header.index(value)
+            # repeated values (regions, channels, ...) are stored once
+            intern = sys.intern
+            for row in reader:
+                if len(positions) == 1:
+                    _key = row[positions[0]]
+                else:
+                    _key = tuple(row[i] for i in positions)
+                # the first row of a key wins
+                if _key not in index:
+                    index[_key] = intern(row[position])
+        self.index = index
+
+    def __len__(self):
+        return len(self.index)
+
+    def get(self, key, default=None):
+        return self.index.get(key, default)
+
+
+class _SqliteTable(object):
+    """
+    reference table of a SQLite file, queried on disk through a memory
+    mapping with a bounded LRU cache of the keys looked up
+    """
+
+    def __init__(self, path, table, key, value, cache_size):
+        # type: (str, str, Tuple[str, ...], str, int) -> None
+        import sqlite3
+        from urllib.parse import quote
+        if table is None:
+            raise ValueError("The 'table' of the lookup table {!r} is required".format(path))
+        self.connection = sqlite3.connect("file:{}?mode=ro".format(quote(os.path.abspath(path))),
+                                          uri=True, check_same_thread=False)
+        self.connection.execute("PRAGMA mmap_size = {:d}".format(_SQLITE_MMAP_SIZE))
+        columns = [row[1] for row in self.connection.execute(
+            "PRAGMA table_info({})".format(_quote_identifier(table)))]
+        missing = [column for column in key + (value, ) if column not in columns]
+        if missing:
+            raise ValueError("Columns {!r} not found in lookup table {!r} of {!r}".format(missing, table, path))
+        query = "SELECT {} FROM {} WHERE {} LIMIT 1".format(
+            _quote_identifier(value), _quote_identifier(table),
+            " AND ".join("{} = ?".format(_quote_identifier(column)) for column in key))
+        execute = self.connection.execute
+
+        def fetch(key):
+            row = execute(query, key if isinstance(key, tuple) else (key, )).fetchone()
+            return _LOOKUP_MISSING if row is None else row[0]
+        self._fetch = lru_cache(maxsize=cache_size)(fetch)
+
+    def __len__(self):
+        return self._fetch.cache_info().currsize
+
+    def get(self, key, default=None):
+        value = self._fetch(key)
+        return default if value is _LOOKUP_MISSING else value
+
+
+def lookup_table(source, key, value, table=None, cache_size=_LOOKUP_CACHE_SIZE):
+    # type: (str, Tuple[str, ...], str, Optional[str], int) -> Any
+    """
+    returns the reference table of `source`, opened once per process: a
+    SQLite file (.db, .sqlite, .sqlite3) is queried on disk, any other file
+    is read as CSV into memory
+    """
+    path = os.path.expanduser(os.path.expandvars(source))
+    # the pid keeps forked worker processes off the connections of the parent
+    cache_key = (os.getpid(), os.path.abspath(path), table, key, value, cache_size)
+    if cache_key not in _LOOKUP_TABLES:
+        if path.lower().endswith(_SQLITE_SUFFIXES):
+            _LOOKUP_TABLES[cache_key] = _SqliteTable(path, table, key, value, cache_size)
+        else:
+            _LOOKUP_TABLES[cache_key] = _CsvTable(path, key, value)
+    return _LOOKUP_TABLES[cache_key]
+
+
+class TypeLookup(object):
+    """
+    Looks a value up in an external reference table, e.g. FX rates or an
+    account to region map. The table is opened once per process and shared
+    by every serializer using it. Keys are compared as strings; a key not
+    found in the table, or a null key, results in `default`. `cast` converts
+    the values found, like the transform of a field.
+
+    A single key is the value of the field (`from`). With `fields`, or a
+    composite `key`, the transform reads the key from the fields of the
+    record, which requires a derived field without `from`.
+
+    Example:
+        inline:
+          - name: region
+            from: account_id
+            transform:
+              type: lookup
+              source: ${ADAPT_CONFIGS}/reference/account_regions.csv
+              key: account_id
+              value: region
+              default: UNKNOWN
+
+        derived:
+          - name: fx_rate
+            transform:
+              type: lookup
+              source: ${ADAPT_CONFIGS}/reference/fx_rates.sqlite
+              table: fx_rates
+              key: [currency, date]
+              fields: [currency, report_date]
+              value: rate
+              cast: float
+    """
+
+    def __init__(self, _source, _key, _value, _table=None, _fields=None, _default=None, _cast=None,
+                 _cache_size=_LOOKUP_CACHE_SIZE, **kwargs):
+        # type: (str, Any[str, List[str]], str, Optional[str], Optional[List[str]], Any, Any, int, Dict) -> None
+        self._params = (_source, _key, _value, _table, _fields, _default, _cast, _cache_size)
+        key = (_key, ) if isinstance(_key, str) else tuple(_key)
+        self.fields = self.record_fields({"key": _key, "fields": _fields})
+        if self.fields is not None and len(self.fields) != len(key):
+            raise ValueError("Lookup fields {!r} do not match the key {!r}".format(self.fields, key))
+        self.default = _default
+        self.table = lookup_table(_source, key, _value, table=_table, cache_size=_cache_size)
+        self._get = self.table.get
+        if isinstance(_cast, str):
+            _cast = {"type": _cast}
+        self.cast = None if _cast is None else init_type(_cast["type"], _cast)
+
+    @staticmethod
+    def record_fields(params):
+        # type: (Dict) -> Optional[Tuple[str, ...]]
+        """ the fields of the record holding the key, None for a single key value """
+        key = params["key"]
+        fields = params.get("fields")
+        if fields is None and isinstance(key, str):
+            return None
+        return tuple(key if fields is None else fields)
+
+    def __reduce__(self):
+        # tables are opened again, and shared, where the copy is loaded
+        return self.__class__, self._params
+
+    def _record_key(self, record):
+        # type: (Dict) -> Any
+        try:
+            key = tuple(_lookup_key(record[field]) for field in self.fields)
+        except KeyError:
+            return None
+        if None in key:
+            return None
+        return key[0] if len(key) == 1 else key
+
+    def __call__(self, value):
+        # type: (Any) -> Any
+        if self.fields is None:
+            key = None if value is None else str(value)
+        else:
+            key = self._record_key(value)
+        if key is None:
+            return self.default
+        found = self._get(key, _LOOKUP_MISSING)
+        if found is _LOOKUP_MISSING:
+            return self.default
+        return found if self.cast is None else self.cast(found)
 
 # ------------------------------------------------------------------
 #                       END: TYPE DEFINITIONS
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+import os
+import csv
+import gzip
+import json
+import shutil
+import tempfile
+
+# setting environment variable for ADAPT_CONFIGS as empty string
+# so that it will not read any configs from the default path
+os.environ["ADAPT_CONFIGS"] = ""
+# the parts are written to a temporary output directory, removed at the end
+OUTPUT_DIR = tempfile.mkdtemp(prefix="adapt-rolling-example.")
+os.environ["ADAPT_OUTPUT_DIR"] = OUTPUT_DIR
+
+from adapt.utils.exporter import CSVExporter, ParquetExporter
+
+
+MAX_ROWS = 700
+RECORDS = 2500
+
+config = {
+    "export": {
+        "filename": "rolling",
+        "fields": ["id", "name"],
+        "unique_on": ["id"],
+        "max_rows": MAX_ROWS,
+    }
+}
+
+
+def records():
+    return ({"id": i, "name": "record {}".format(i)} for i in range(RECORDS))
+
+
+def expected_rows():
+    """ full parts of max_rows rows, and the rest in the last part """
+    full, rest = divmod(RECORDS, MAX_ROWS)
+    return [MAX_ROWS] * full + ([rest] if rest else [])
+
+
+def check_manifest(paths):
+    manifest_path = paths[0].rsplit("_", 1)[0] + ".manifest.json"
+    with open(manifest_path) as _file:
+        manifest = json.load(_file)
+    assert manifest["complete"] and manifest["rows"] == RECORDS
+    assert [part["rows"] for part in manifest["parts"]] == expected_rows(), manifest["parts"]
+
+
+def check_csv():
+    paths = CSVExporter.lazy_run(config, records())
+    rows = []
+    for path in paths:
+        with gzip.open(path, "rt", newline="") as _file:
+            # minus the header row
+            rows.append(sum(1 for _ in csv.reader(_file, dialect="excel-tab")) - 1)
+    assert rows == expected_rows(), rows
+    check_manifest(paths)
+    print("[OK] csv parts of {} rows".format(rows))
+
+
+def check_parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("[SKIP] parquet parts, pyarrow is not installed")
+        return
+    paths = ParquetExporter.lazy_run(config, records())
+    rows = [pq.ParquetFile(path).metadata.num_rows for path in paths]
+    assert rows == expected_rows(), rows
+    check_manifest(paths)
+    print("[OK] parquet parts of {} rows".format(rows))
+
+
+def main():
+    """
+    exports records with `export.max_rows` below the rows read at once,
+    and checks the row count of every part and of its manifest entry
+    """
+    try:
+        check_csv()
+        check_parquet()
+    finally:
+        shutil.rmtree(OUTPUT_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+from typing import Any, Dict, Generator, Iterable, List, Optional
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import shutil
+import tempfile
+
+
+__all__ = [
+    "UniqueFilter"
+]
+
+# width of the key digests, collisions are negligible at 128 bits
+_DIGEST_SIZE = 16
+
+# default memory budget of a filter, in bytes
+_DEDUP_MEMORY = 256 << 20
+
+# bytes held by a digest in the in-memory set, object and table slot
+_SET_ENTRY_SIZE = 80
+
+# bloom filters of the spilled runs, about 1% of the lookups read the run
+_RUN_BITS_PER_KEY = 10
+_RUN_HASHES = 7
+
+# false drop rate of the approximate mode
+_ERROR_RATE = 1e-6
+
+# digests read at once from the runs while merging them
+_MERGE_READ = 4096
+
+
+def _normalize(value):
+    # type: (Any) -> Any
+    """ equal numbers have one repr, as in the set: True, 1.0 and 1 are the key 1 """
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def key_digest(key):
+    # type: (Any) -> bytes
+    """ fixed width digest of a `unique_on` key """
+    if isinstance(key, tuple):
+        key = tuple(map(_normalize, key))
+    else:
+        key = _normalize(key)
+    return hashlib.blake2b(repr(key).encode("utf-8", "surrogatepass"), digest_size=_DIGEST_SIZE).digest()
+
+
+class _Bloom(object):
+    """ bloom filter over digests, the probes are derived from the digest bits """
+
+    __slots__ = ("size", "hashes", "bits")
+
+    def __init__(self, size, hashes):
+        # type: (int, int) -> None
+        self.size = max(int(size), 64)
+        self.hashes = max(int(hashes), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    @property
+    def nbytes(self):
+        # type: () -> int
+        return len(self.bits)
+
+    def _positions(self, digest):
+        # type: (bytes) -> List[int]
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, digest):
+        # type: (bytes) -> bool
+        """ returns True when the digest was not in the filter """
+        bits = self.bits
+        new = False
+        for position in self._positions(digest):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                new = True
+        return new
+
+    def __contains__(self, digest):
+        bits = self.bits
+        for position in self._positions(digest):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class _Run(object):
+    """
+    Digests spilled to disk: sorted, so partitioned by their first byte,
+    with the offset of each partition and a bloom filter kept in memory.
+    A lookup reads the file, through mmap, only on a bloom filter hit.
+    """
+
+    def __init__(self, path, digests, count):
+        # type: (str, Iterable[bytes], int) -> None
+        self.path = path
+        self.count = count
+        self.bloom = _Bloom(count * _RUN_BITS_PER_KEY, _RUN_HASHES)
+        # index of the first digest of each first byte partition
+        self.offsets = [0] * 257
+        with open(path, "wb") as _file:
+            for digest in digests:
+                _file.write(digest)
+                self.bloom.add(digest)
+                self.offsets[digest[0] + 1] += 1
+        for i in range(256):
+            self.offsets[i + 1] += self.offsets[i]
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if count else None
+
+    @property
+    def nbytes(self):
+        # type: () -> int
+        return self.bloom.nbytes + 8 * len(self.offsets)
+
+    def __contains__(self, digest):
+        if digest not in self.bloom:
+            return False
+        _map = self._map
+        low, high = self.offsets[digest[0]], self.offsets[digest[0] + 1]
+        while low < high:
+            middle = (low + high) // 2
+            found = _map[middle * _DIGEST_SIZE:(middle + 1) * _DIGEST_SIZE]
+            if found == digest:
+                return True
+            if found < digest:
+                low = middle + 1
+            else:
+                high = middle
+        return False
+
+    def __iter__(self):
+        if self._map is None:
+            return
+        chunk = _DIGEST_SIZE * _MERGE_READ
+        for start in range(0, len(self._map), chunk):
+            block = self._map[start:start + chunk]
+            for offset in range(0, len(block), _DIGEST_SIZE):
+                yield block[offset:offset + _DIGEST_SIZE]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+        os.remove(self.path)
+
+
+class UniqueFilter(object):
+    """
+    Memory bounded deduplication of records on their `unique_on` key.
+
+    Keys are reduced to 16 byte digests, held in a set until the set
+    reaches the `memory` budget (bytes). The set is then spilled to disk
+    as a sorted run, with a bloom filter and the offsets of its first
+    byte partitions kept in memory (about 1.3 bytes per spilled key).
+    A run is merged with the previous one while it is at least as large,
+    which keeps a logarithmic number of runs. A key is looked up in the
+    set, then in the runs whose bloom filter matches it.
+
+    With `approximate`, a single bloom filter of `memory` bytes replaces
+    the set and nothing is spilled: a new key is dropped as a duplicate
+    with a probability of about `error_rate` at `expected` keys.
+    """
+
+    def __init__(self, memory=_DEDUP_MEMORY, approximate=False, error_rate=_ERROR_RATE,
+                 expected=None, spill_dir=None):
+        # type: (int, bool, float, Optional[int], Optional[str]) -> None
+        self.memory = int(memory)
+        if self.memory < 1:
+            raise ValueError("memory must be positive: {!r}".format(memory))
+        self.approximate = approximate
+        self.spill_dir = spill_dir
+        self.keys = 0
+        self.duplicates = 0
+        self.spills = 0
+        self._seen = set()
+        self._runs = []
+        self._dir = None
+        self._bloom = None
+        if approximate:
+            size = self.memory * 8
+            if expected:
+                # the fewest bits reaching error_rate at the expected keys, within the budget
+                size = min(size, int(-expected * math.log(error_rate) / math.log(2) ** 2))
+                hashes = round(size / float(expected) * math.log(2))
+            else:
+                hashes = round(-math.log(error_rate, 2))
+            self._bloom = _Bloom(size, hashes)
+
+    @classmethod
+    def from_config(cls, options):
+        # type: (Any[bool, Dict]) -> UniqueFilter
+        """ `options`: the `export.dedup` config """
+        options = options if isinstance(options, dict) else {}
+        return cls(memory=options.get("memory", _DEDUP_MEMORY),
+                   approximate=options.get("approximate", False),
+                   error_rate=options.get("error_rate", _ERROR_RATE),
+                   expected=options.get("expected"),
+                   spill_dir=options.get("spill_dir"))
+
+    def _capacity(self):
+        # type: () -> int
+        """ digests held in memory before the next spill """
+        runs = sum(run.nbytes for run in self._runs)
+        # the set keeps a quarter of the budget, once the runs outgrow it
+        return max(self.memory - runs, self.memory // 4) // _SET_ENTRY_SIZE
+
+    def _new_run(self, digests, count):
+        # type: (Iterable[bytes], int) -> _Run
+        if self._dir is None:
+            self._dir = tempfile.mkdtemp(prefix="adapt-dedup.", dir=self.spill_dir)
+        path = os.path.join(self._dir, "run{:06d}.bin".format(self.spills))
+        self.spills += 1
+        return _Run(path, digests, count)
+
+    def _spill(self):
+        runs = self._runs
+        runs.append(self._new_run(sorted(self._seen), len(self._seen)))
+        self._seen = set()
+        while len(runs) > 1 and runs[-1].count >= runs[-2].count:
+            # the runs hold distinct keys, merged without duplicates
+            merged = runs[-2:]
+            runs[-2:] = [self._new_run(heapq.merge(*merged), sum(run.count for run in merged))]
+            for run in merged:
+                run.close()
+
+    def add(self, key):
+        # type: (Any) -> bool
+        """ returns True when the key was not seen before """
+        digest = key_digest(key)
+        if self._bloom is not None:
+            new = self._bloom.add(digest)
+        else:
+            new = digest not in self._seen
+            if new:
+                for run in self._runs:
+                    if digest in run:
+                        new = False
+                        break
+            if new:
+                self._seen.add(digest)
+                if len(self._seen) >= self._capacity():
+                    self._spill()
+        if new:
+            self.keys += 1
+        else:
+            self.duplicates += 1
+        return new
+
+    def filter(self, records, unique_on):
+        # type: (Iterable, List[str]) -> Generator
+        """ yields the records with a key not seen before, the spilled runs are removed at the end """
+        add = self.add
+        try:
+            for record in records:
+                if add(tuple(record[key] for key in unique_on)):
+                    yield record
+        finally:
+            self.close()
+
+    def close(self):
+        for run in self._runs:
+            run.close()
+        self._runs = []
+        self._seen = set()
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
@@ -16,21 +16,91 @@
 # **************************************************************************/
 
 import os
+import io
 import time
 import datetime
 import csv
 import gzip
+import hashlib
+import itertools
+import json
 import tempfile
+import uuid
+from operator import itemgetter
+from typing import Dict, List, Optional
 
 
 __all__ = [
-    "CSVExporter"
+    "CSVExporter",
+    "ParquetExporter"
 ]
 
 ADAPT_OUTPUT_DIR = os.getenv("ADAPT_OUTPUT_DIR", "/tmp")
 
+# rows read and written at once, between two checks of the size of a part
+_ROLL_CHECK_ROWS = 1000
 
-def filter_unique_records(records, unique_on):
+# defaults of the `export.parquet` config
+_PARQUET_ROW_GROUP_SIZE = 131072
+_PARQUET_COMPRESSION = "snappy"
+
+# arrow types of the logical types of the serializer output schema; the
+# "list" and "any" fields take the type inferred from their values
+_ARROW_TYPES = {
+    "string": "string",
+    "integer": "int64",
+    "float": "float64",
+    "boolean": "bool_",
+}
+
+# the "date" fields of this format are written as dates, others as strings
+_ISO_DATE_FORMAT = "%Y-%m-%d"
+
+
+def _pyarrow():
+    # pyarrow is optional, only the ParquetExporter needs it
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("the ParquetExporter needs pyarrow: pip install 'adapt-utils[parquet]'")
+    return pyarrow
+
+
+def row_getter(headers, missing=''):
+    """
+    returns the values of the `headers` fields of a record, in order, with
+    one itemgetter call; a record missing some of the fields falls back to
+    per field lookups, the missing fields take the `missing` value
+    """
+    getter = itemgetter(*headers)
+    if len(headers) == 1:
+        single = getter
+
+        def getter(record):
+            return single(record),
+
+    def get_row(record):
+        try:
+            return getter(record)
+        except KeyError:
+            return [record.get(key, missing) for key in headers]
+    return get_row
+
+
+def filter_unique_records(records, unique_on, options=None):
+    """
+    with the `export.dedup` options, the keys seen are held within a
+    memory budget, see dedup.UniqueFilter
+    """
+    if options is not None:
+        from adapt.utils.dedup import UniqueFilter
+        unique = UniqueFilter.from_config(options)
+        for record in unique.filter(records, unique_on):
+            yield record
+        print("[EXPORTER] unique_on: {} duplicates dropped, {} keys, {} spills{}".format(
+            unique.duplicates, unique.keys, unique.spills, " (approximate)" if unique.approximate else ""))
+        return
     seen = set()
     for record in records:
         unique_token = tuple(record[key] for key in unique_on)
@@ -39,8 +109,93 @@ def filter_unique_records(records, unique_on):
             yield record
 
 
+class _HashingFile(object):
+    """ binary file counting and hashing the bytes written, while streaming """
+
+    def __init__(self, file_path):
+        self._file = open(file_path, "wb")
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.bytes += len(data)
+        return self._file.write(data)
+
+    @property
+    def closed(self):
+        # type: () -> bool
+        return self._file.closed
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class _Part(object):
+    """ output file being written, published under its final name when complete """
+
+    def __init__(self, tmp_file, file_path, headers, gzip_options=None):
+        self.tmp_file = tmp_file
+        self.file_path = file_path
+        self.rows = 0
+        self._raw = _HashingFile(tmp_file)
+        if gzip_options is None:
+            self._fd = io.TextIOWrapper(gzip.GzipFile(fileobj=self._raw, mode="wb"),
+                                        encoding='utf-8', newline='')
+        else:
+            # blocks of the file are compressed in parallel
+            from adapt.utils.gzip_writer import ParallelGzipWriter
+            self._fd = ParallelGzipWriter.from_config(self._raw, gzip_options)
+        self._writer = csv.writer(self._fd, dialect='excel-tab', quoting=csv.QUOTE_MINIMAL)
+        self._writer.writerow(headers)
+
+    @property
+    def bytes(self):
+        # type: () -> int
+        """ compressed bytes written so far, the compressor holds the rest """
+        return self._raw.bytes
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+        self.rows += len(rows)
+
+    def _close(self):
+        try:
+            self._fd.close()
+        finally:
+            self._raw.close()
+
+    def publish(self):
+        """ closes the file and renames it to its final name, atomically """
+        self._close()
+        os.replace(self.tmp_file, self.file_path)
+        print("[EXPORTER] exported to file: {!r}".format(self.file_path))
+        return {
+            "file": os.path.basename(self.file_path),
+            "rows": self.rows,
+            "bytes": self._raw.bytes,
+            "sha256": self._raw.sha256.hexdigest(),
+        }
+
+    def discard(self):
+        try:
+            self._close()
+        finally:
+            if os.path.exists(self.tmp_file):
+                os.remove(self.tmp_file)
+
+
 class CSVExporter:
 
+    # suffix of the output files
+    _SUFFIX = ".csv.gz"
+
+    # value written for the export fields missing from a record
+    _MISSING = ''
+
     @property
     def _output_base_dir(self):
         today = datetime.datetime.today().strftime("%Y%m%d")
@@ -50,47 +205,139 @@ class CSVExporter:
         if not os.path.exists(self._output_base_dir):
             os.makedirs(self._output_base_dir)
 
-    @staticmethod
-    def _mk_temp_file(file_name, output_path):
+    @classmethod
+    def _mk_temp_file(cls, file_name, output_path):
+        """ hidden and with a .tmp suffix, loaders do not pick it up """
         _fd, tmp_file = tempfile.mkstemp(
-            prefix=".".join([file_name, datetime.datetime.now().strftime('%Y-%m-%d.%H%M%S%f.')]),
+            prefix=".".join(["", file_name, datetime.datetime.now().strftime('%Y-%m-%d.%H%M%S%f.')]),
             dir=output_path,
-            suffix='.csv.gz'
+            suffix=cls._SUFFIX + '.tmp'
         )
         os.close(_fd)
         return tmp_file
 
     @staticmethod
-    def _get_file_descriptor(file_path, headers):
-        _fd = gzip.open(file_path, mode="wt", encoding='utf-8', newline='')
-        _writer = csv.DictWriter(_fd,
-                                 fieldnames=headers,
-                                 extrasaction='ignore',
-                                 restval='',
-                                 dialect='excel-tab',
-                                 quoting=csv.QUOTE_MINIMAL)
-        _writer.writeheader()
-        return _fd, _writer
+    def _is_positional(record, headers):
+        """
+        compact serializer records holding the export fields first are
+        written by position, without per field lookups
+        """
+        fields = getattr(record, "_fields", None)
+        return isinstance(record, tuple) and fields is not None \
+            and tuple(fields[:len(headers)]) == tuple(headers)
 
-    @staticmethod
-    def _get_file_name(config, output_path):
-        file_name = "{fname}_{ts}.csv.gz".format(fname=config["export"]['filename'],
-                                                 ts=format(time.time() * 1000, ".0f"))
-        return os.path.join(output_path, file_name)
+    @classmethod
+    def _rows(cls, first, records, headers):
+        """
+        the values of the export fields of the records, in the header
+        order: compact records are sliced, other records (dicts, views,
+        compact records of other fields) read through an itemgetter
+        """
+        if first is not None and cls._is_positional(first, headers):
+            size = len(headers)
+            if len(first) == size:
+                return records
+            return (record[:size] for record in records)
+        return map(row_getter(headers, cls._MISSING), records)
+
+    @classmethod
+    def _get_file_name(cls, config, output_path, ts, part=None):
+        file_name = "{fname}_{ts}".format(fname=config["export"]['filename'], ts=ts)
+        if part is not None:
+            file_name = "{}_{:05d}".format(file_name, part)
+        return os.path.join(output_path, file_name + cls._SUFFIX)
+
+    def _open_part(self, ts, part=None):
+        # type: (str, Optional[int]) -> _Part
+        export = self.config["export"]
+        return _Part(self._mk_temp_file(file_name=export['filename'], output_path=self._output_base_dir),
+                     self._get_file_name(self.config, self._output_base_dir, ts, part),
+                     export['fields'], gzip_options=export.get("gzip"))
+
+    def _write_manifest(self, ts, parts, complete):
+        # type: (str, List[Dict], bool) -> str
+        """
+        lists the published parts with their row counts and checksums,
+        rewritten atomically after each part
+        """
+        export = self.config["export"]
+        manifest_path = os.path.join(self._output_base_dir,
+                                     "{}_{}.manifest.json".format(export['filename'], ts))
+        manifest = {
+            "filename": export['filename'],
+            "fields": export['fields'],
+            "complete": complete,
+            "rows": sum(part["rows"] for part in parts),
+            "parts": parts,
+        }
+        _fd, tmp_file = tempfile.mkstemp(prefix=".manifest.", dir=self._output_base_dir, suffix=".tmp")
+        with os.fdopen(_fd, "w") as _file:
+            json.dump(manifest, _file, indent=2)
+        os.replace(tmp_file, manifest_path)
+        return manifest_path
 
     def export(self, records):
+        """
+        writes the records to a temporary file, renamed to its final name
+        `{filename}_{ts}.csv.gz` once complete, where `ts` is the millisecond
+        timestamp and a random run id. With `export.max_rows` or
+        `export.max_bytes` (compressed, checked every few rows) the export
+        rolls over part files `{filename}_{ts}_{part}.csv.gz`, each published
+        as soon as it is complete, and listed with its row count and sha256
+        in `{filename}_{ts}.manifest.json`. Returns the file path, or the
+        paths of the parts when the export rolls.
+        """
         self.create_output_directory()
-        file_path = self._mk_temp_file(
-            file_name=self.config["export"]['filename'],
-            output_path=self._output_base_dir
-        )
-        _fd, _writer = self._get_file_descriptor(file_path, self.config["export"]['fields'])
-        for record in filter_unique_records(records, self.config["export"]['unique_on']):
-            _writer.writerow(record)
-        _fd.flush()
-        _fd.close()
-        print("[EXPORTER] exported to file: {!r}".format(file_path))
-        return file_path
+        export = self.config["export"]
+        headers = export['fields']
+        records = iter(records)
+        first = next(records, None)
+        if first is not None:
+            records = itertools.chain([first], records)
+        records = filter_unique_records(records, export['unique_on'], export.get("dedup"))
+        rows = self._rows(first, records, headers)
+
+        max_rows = export.get("max_rows")
+        max_bytes = export.get("max_bytes")
+        rolling = bool(max_rows or max_bytes)
+        manifest = rolling or export.get("manifest", False)
+        # a random run id, concurrent runs of the config never publish the same names
+        ts = "{}_{}".format(format(time.time() * 1000, ".0f"), uuid.uuid4().hex[:8])
+        parts = []
+        paths = []
+        part = None
+        try:
+            while True:
+                # rows are read in bounded chunks, whatever the size of a part
+                size = _ROLL_CHECK_ROWS
+                if max_rows:
+                    size = min(size, max_rows - (part.rows if part is not None else 0))
+                chunk = list(itertools.islice(rows, size))
+                if not chunk:
+                    break
+                if part is None:
+                    part = self._open_part(ts, len(parts) + 1 if rolling else None)
+                part.write(chunk)
+                if rolling and ((max_rows and part.rows >= max_rows) or
+                                (max_bytes and part.bytes >= max_bytes)):
+                    parts.append(part.publish())
+                    paths.append(part.file_path)
+                    part = None
+                    self._write_manifest(ts, parts, complete=False)
+            if part is None and not parts:
+                # no records, the file holds the headers
+                part = self._open_part(ts, 1 if rolling else None)
+            if part is not None:
+                parts.append(part.publish())
+                paths.append(part.file_path)
+                part = None
+        finally:
+            if part is not None:
+                # the published parts stay listed in the incomplete manifest
+                part.discard()
+        if manifest:
+            print("[EXPORTER] manifest written: {!r}".format(self._write_manifest(ts, parts, complete=True)))
+        return paths if rolling else paths[0]
 
     @classmethod
     def init(cls, config):
@@ -101,3 +348,175 @@ class CSVExporter:
     @classmethod
     def lazy_run(cls, config, records):
         return cls.init(config).export(records)
+
+
+def _iso_dates(values):
+    # type: (List) -> List[Optional[datetime.date]]
+    return [None if value is None else datetime.date.fromisoformat(value) for value in values]
+
+
+class _ParquetColumn(object):
+    """
+    arrow type of an export field, from its logical type; a field of no
+    known type takes the type inferred from its values in the first row
+    group, and keeps it in the following row groups and parts
+    """
+
+    def __init__(self, name, logical_type=None, date_format=None):
+        # type: (str, Optional[str], Optional[str]) -> None
+        pa = _pyarrow()
+        self.name = name
+        self._convert = None
+        if logical_type == "date":
+            if date_format == _ISO_DATE_FORMAT:
+                self.type = pa.date32()
+                self._convert = _iso_dates
+            else:
+                self.type = pa.string()
+        elif logical_type in _ARROW_TYPES:
+            self.type = getattr(pa, _ARROW_TYPES[logical_type])()
+        elif logical_type in (None, "list", "any"):
+            self.type = None
+        else:
+            raise ValueError("unknown type {!r} of the parquet field {!r}".format(logical_type, name))
+
+    def array(self, values):
+        # type: (List) -> Any
+        pa = _pyarrow()
+        try:
+            if self._convert is not None:
+                values = self._convert(values)
+            if self.type is None:
+                array = pa.array(values)
+                # a field of nulls only is written as strings
+                self.type = pa.string() if pa.types.is_null(array.type) else array.type
+            return pa.array(values, type=self.type)
+        except (TypeError, ValueError) as error:
+            raise ValueError("the parquet field {!r} does not hold {} values, set its type in "
+                             "export.parquet.types: {}".format(self.name, self.type or "consistent", error))
+
+
+class _ParquetPart(_Part):
+    """
+    parquet output file being written: the rows are buffered by column and
+    written as a row group every `row_group_size` rows, so that a single
+    row group is held in memory; published like the csv parts
+    """
+
+    def __init__(self, tmp_file, file_path, columns, options):
+        # type: (str, str, List[_ParquetColumn], Dict) -> None
+        self.tmp_file = tmp_file
+        self.file_path = file_path
+        self.rows = 0
+        self._columns = columns
+        self._row_group_size = int(options.get("row_group_size", _PARQUET_ROW_GROUP_SIZE))
+        if self._row_group_size < 1:
+            raise ValueError("row_group_size must be positive: {!r}".format(options["row_group_size"]))
+        compression = options.get("compression", _PARQUET_COMPRESSION)
+        self._writer_options = {
+            "compression": compression or "none",
+            "compression_level": options.get("compression_level"),
+            "use_dictionary": options.get("dictionary", True),
+        }
+        self._buffers = [[] for _ in columns]
+        self._buffered = 0
+        self._writer = None
+        self._raw = _HashingFile(tmp_file)
+
+    def write(self, rows):
+        start = 0
+        while start < len(rows):
+            end = start + self._row_group_size - self._buffered
+            chunk = rows[start:end]
+            for buffer, values in zip(self._buffers, zip(*chunk)):
+                buffer.extend(values)
+            self._buffered += len(chunk)
+            if self._buffered >= self._row_group_size:
+                self._flush()
+            start = end
+        self.rows += len(rows)
+
+    def _flush(self):
+        """ writes the buffered rows as a row group, the first one opens the writer """
+        pa = _pyarrow()
+        arrays = [column.array(values) for column, values in zip(self._columns, self._buffers)]
+        schema = pa.schema([pa.field(column.name, column.type) for column in self._columns])
+        if self._writer is None:
+            self._writer = pa.parquet.ParquetWriter(self._raw, schema, **self._writer_options)
+        if self._buffered:
+            self._writer.write_table(pa.Table.from_arrays(arrays, schema=schema),
+                                     row_group_size=self._buffered)
+        self._buffers = [[] for _ in self._columns]
+        self._buffered = 0
+
+    def _close(self):
+        try:
+            if self._writer is not None:
+                self._writer.close()
+        finally:
+            self._raw.close()
+
+    def publish(self):
+        if self._buffered or self._writer is None:
+            # an export without records still writes the schema
+            self._flush()
+        return super(_ParquetPart, self).publish()
+
+
+class ParquetExporter(CSVExporter):
+    """
+    Exports the records to parquet files, with the interface and the
+    `export` config of the CSVExporter: `unique_on`, `dedup`, rolling parts
+    and manifests. The `export.parquet` mapping sets the `row_group_size`,
+    the `compression` codec and its `compression_level`, the `dictionary`
+    encoded fields (true, false or a list) and the logical `types` of the
+    fields. The other types, and the default dictionary fields, are derived
+    from the serializer config when the adapt.serializer package is
+    installed; otherwise the types are inferred and every field is
+    dictionary encoded.
+    """
+
+    _SUFFIX = ".parquet"
+
+    # missing fields are nulls
+    _MISSING = None
+
+    def _parquet_columns(self):
+        # type: () -> List[_ParquetColumn]
+        export = self.config["export"]
+        types = {}
+        try:
+            from adapt.serializer import schema
+        except ImportError:
+            schema = None
+        # without the serializer schema, every field is dictionary encoded
+        self._dictionary = True
+        if schema is not None:
+            self._dictionary = []
+            for column in schema.output_schema(self.config, fields=export['fields']):
+                types[column.name] = (column.type, column.format)
+                if column.dictionary:
+                    self._dictionary.append(column.name)
+        for name, logical_type in (export.get("parquet") or {}).get("types", {}).items():
+            types[name] = (logical_type, _ISO_DATE_FORMAT)
+        return [_ParquetColumn(name, *types.get(name, ())) for name in export['fields']]
+
+    def _open_part(self, ts, part=None):
+        # type: (str, Optional[int]) -> _ParquetPart
+        export = self.config["export"]
+        options = dict(export.get("parquet") or {})
+        # the dictionary columns of the serializer schema, unless configured
+        options.setdefault("dictionary", self._dictionary or False)
+        return _ParquetPart(self._mk_temp_file(file_name=export['filename'], output_path=self._output_base_dir),
+                            self._get_file_name(self.config, self._output_base_dir, ts, part),
+                            self._columns, options)
+
+    def export(self, records):
+        """
+        writes the records to `{filename}_{ts}.parquet`, or to rolling parts
+        `{filename}_{ts}_{part}.parquet`, like CSVExporter.export; the
+        `export.max_bytes` of a part is checked against the row groups
+        already written
+        """
+        self._columns = self._parquet_columns()
+        return super(ParquetExporter, self).export(records)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+from typing import Any, BinaryIO, Dict, Optional
+from concurrent import futures
+import collections
+import os
+import zlib
+
+
+__all__ = [
+    "ParallelGzipWriter"
+]
+
+# compression defaults of the `export.gzip` config
+_GZIP_LEVEL = 6
+_GZIP_BLOCK_SIZE = 1 << 20
+
+# zlib window bits writing a gzip header and trailer
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def _compress(data, level):
+    # type: (bytes, int) -> bytes
+    """ one complete gzip member, zlib releases the GIL while compressing """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _GZIP_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+class ParallelGzipWriter(object):
+    """
+    Text file writing gzip compressed output, compressed on a thread pool.
+
+    Written text is buffered into blocks of about `block_size` characters.
+    Each block is encoded and compressed as a gzip member of its own by one
+    of `workers` threads, while the next block is filled. A background
+    writer appends the members to the file in order. A file of concatenated
+    gzip members is a valid `.gz` file, read as a whole by gzip, zcat and
+    the gzip module. At most twice `workers` blocks are held in memory.
+    """
+
+    def __init__(self, file_path, level=_GZIP_LEVEL, workers=None, block_size=_GZIP_BLOCK_SIZE,
+                 encoding="utf-8"):
+        # type: (Any[str, BinaryIO], int, Optional[int], int, str) -> None
+        """ `file_path`: a path, or a binary file left open by close """
+        self.level = int(level)
+        self.workers = int(workers or os.cpu_count() or 1)
+        self.block_size = int(block_size)
+        if self.block_size < 1:
+            raise ValueError("block_size must be positive: {!r}".format(block_size))
+        self.encoding = encoding
+        self._buffer = []
+        self._buffered = 0
+        self._pending = collections.deque()
+        self._owned = isinstance(file_path, str)
+        self._file = open(file_path, "wb") if self._owned else file_path
+        self._compressors = futures.ThreadPoolExecutor(max_workers=self.workers)
+        # a single thread, blocks are written in the order they are submitted
+        self._writer = futures.ThreadPoolExecutor(max_workers=1)
+        self._blocks = 0
+        self.closed = False
+
+    @classmethod
+    def from_config(cls, file_path, options):
+        # type: (Any[str, BinaryIO], Dict) -> ParallelGzipWriter
+        """ `options`: the `export.gzip` config, `level`, `workers` and `block_size` """
+        options = options if isinstance(options, dict) else {}
+        return cls(file_path, level=options.get("level", _GZIP_LEVEL), workers=options.get("workers"),
+                   block_size=options.get("block_size", _GZIP_BLOCK_SIZE))
+
+    def _write_member(self, member):
+        # type: (futures.Future) -> None
+        self._file.write(member.result())
+
+    def _submit(self):
+        data = "".join(self._buffer).encode(self.encoding)
+        self._buffer = []
+        self._buffered = 0
+        member = self._compressors.submit(_compress, data, self.level)
+        self._pending.append(self._writer.submit(self._write_member, member))
+        self._blocks += 1
+        # bounds the blocks held in memory, and raises a failed write
+        while len(self._pending) > 2 * self.workers:
+            self._pending.popleft().result()
+
+    def write(self, text):
+        # type: (str) -> int
+        if self.closed:
+            raise ValueError("write to a closed file")
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.block_size:
+            self._submit()
+        return len(text)
+
+    def flush(self):
+        """ compressed blocks are written by the background writer, see close """
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self._buffer or not self._blocks:
+                # an empty file is still a valid gzip file
+                self._submit()
+            while self._pending:
+                self._pending.popleft().result()
+        finally:
+            for future in self._pending:
+                future.cancel()
+            self._compressors.shutdown(wait=True)
+            self._writer.shutdown(wait=True)
+            if self._owned:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()